@@ -1,21 +1,37 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
-import pytz
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+import json
 from sqlalchemy.sql import func
 
-from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.core.timezones import DEFAULT_LOCALE, DEFAULT_TIMEZONE, UTCJSONResponse, as_utc, utcnow
+from app.core.security import get_current_principal, invalidate_principal
 from app.models.user import User
+from app.schemas.user import UserPrincipal
 from app.models.chat import ChatSession, ChatMessage
 from app.schemas.chat import (
+    ChatBatchMessage,
+    ChatMessageBatchCreate,
+    ChatMessageBatchResponse,
     ChatMessageCreate,
     ChatMessageResponse,
     ChatSessionResponse,
-    ChatHistoryResponse
+    ChatHistoryResponse,
+    REPLY_ID_SUFFIX
 )
 from app.services.chat_service import ChatService
+from app.services.context_builder import ConversationContext, context_builder
+from app.services.risk_detector import RISK_LEVELS, max_risk_level, risk_detector
+from app.services.sentiment import sentiment_classifier
+from app.services.metrics import session_aggregates_update
+from app.core.config import settings
 from app.services import summary as summary_service
 from fastapi.security import HTTPBearer
 
@@ -23,175 +39,505 @@ router = APIRouter()
 chat_service = ChatService()
 security = HTTPBearer()
 
-# Set timezone to America/Sao_Paulo
-tz = pytz.timezone('America/Sao_Paulo')
+# Chat history pagination
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 100
+HISTORY_PREVIEW_LENGTH = 120
 
-@router.post("/message", response_model=ChatMessageResponse, dependencies=[Depends(security)])
-async def send_message(
-    message: ChatMessageCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    # Get or create active chat session
-    chat_session = db.query(ChatSession).filter(
-        ChatSession.user_id == current_user.id,
-        ChatSession.is_active == True
-    ).first()
+async def _get_active_session(db: AsyncSession, user_id: int) -> Optional[ChatSession]:
+    result = await db.execute(
+        select(ChatSession).where(
+            ChatSession.user_id == user_id,
+            ChatSession.is_active == True
+        )
+    )
+    return result.scalars().first()
+
+async def _get_user_session(db: AsyncSession, session_id: int, user_id: int) -> Optional[ChatSession]:
+    result = await db.execute(
+        select(ChatSession).where(
+            ChatSession.id == session_id,
+            ChatSession.user_id == user_id
+        )
+    )
+    return result.scalars().first()
+
+async def _get_or_create_active_session(db: AsyncSession, user: UserPrincipal) -> ChatSession:
+    """
+    Return the user's active chat session, creating one if needed.
+
+    A new session is only flushed (INSERT ... RETURNING id); it is committed
+    together with the caller's first write.
+    """
+    chat_session = await _get_active_session(db, user.id)
     
     if not chat_session:
-        now = datetime.now(tz)
         chat_session = ChatSession(
-            user_id=current_user.id,
-            started_at=now.isoformat(),
-            created_at=now
+            user_id=user.id,
+            started_at=utcnow()
         )
         db.add(chat_session)
-        db.commit()
-        db.refresh(chat_session)
-    else:
-        # Update session timestamps
-        chat_session.updated_at = datetime.now(tz)
-    
-    # Create user message
-    user_message = ChatMessage(
-        session_id=chat_session.id,
-        content=message.content,
-        is_user=message.is_user
+        try:
+            await db.flush()
+        except IntegrityError:
+            # Created concurrently by another request (uq_chat_sessions_user_id_active)
+            await db.rollback()
+            return await _get_active_session(db, user.id)
+    return chat_session
+
+async def _reserve_session(db: AsyncSession, user: UserPrincipal) -> ChatSession:
+    """
+    Return the user's active session, or consume one session of quota and start one.
+
+    Safe under concurrent starts: the quota check is a conditional UPDATE on
+    the user row and uq_chat_sessions_user_id_active allows a single active
+    session, so a racing request rolls back its increment and gets the
+    session the other one created.
+    """
+    active_session = await _get_active_session(db, user.id)
+    if active_session:
+        return active_session
+
+    reserved = await db.execute(
+        update(User)
+        .where(User.id == user.id, User.used_sessions < User.available_sessions)
+        .values(used_sessions=User.used_sessions + 1)
+        .execution_options(synchronize_session=False)
     )
-    db.add(user_message)
-    db.commit()
-    db.refresh(user_message)
+    if not reserved.rowcount:
+        await db.rollback()
+        # The last session of quota may have just been spent starting it concurrently
+        active_session = await _get_active_session(db, user.id)
+        if active_session:
+            return active_session
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Você não tem mais sessões disponíveis. Por favor, adquira mais sessões para continuar."
+        )
+
+    new_session = ChatSession(
+        user_id=user.id,
+        started_at=utcnow(),
+        is_active=True
+    )
+    db.add(new_session)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return await _get_active_session(db, user.id)
+
+    # Core UPDATE bypasses the ORM event that drops the cached principal
+    invalidate_principal(user.email)
+    await db.refresh(new_session)
+    return new_session
 
+async def _save_user_message(db: AsyncSession, chat_session: ChatSession, message: ChatMessageCreate) -> ChatMessage:
+    """Insert the user's message and raise the session risk level; the caller commits."""
+    sentiment = None
     if message.is_user:
-        # Get context from previous messages
-        context = db.query(ChatMessage).filter(
-            ChatMessage.session_id == chat_session.id
-        ).order_by(ChatMessage.created_at.desc()).limit(5).all()
-        
-        # Get AI response
-        ai_response = await chat_service.get_ai_response(message, context)
-        
-        # Create AI message
-        ai_message = ChatMessage(
-            session_id= chat_session.id,
-            content= ai_response,
-            is_user=False
+        sentiment = sentiment_classifier.classify(message.content)
+        await _record_risk_level(db, chat_session, message.content)
+    return await _insert_message(
+        db, chat_session.id, content=message.content, is_user=message.is_user, sentiment=sentiment
+    )
+
+async def _insert_message(db: AsyncSession, session_id: int, **values) -> ChatMessage:
+    """
+    Insert one message with INSERT ... RETURNING and add it to the session aggregates.
+
+    The aggregates UPDATE also bumps the session's updated_at. Does not
+    commit, so callers group it with their other writes.
+    """
+    message = await db.scalar(
+        insert(ChatMessage).values(session_id=session_id, **values).returning(ChatMessage)
+    )
+    await db.execute(session_aggregates_update(session_id, [message]))
+    return message
+
+async def _record_risk_level(db: AsyncSession, chat_session: ChatSession, *contents: str) -> None:
+    """Raise the session risk level if the most severe of these messages is above what was seen so far."""
+    level = max_risk_level(*(risk_detector.scan(content).level for content in contents))
+    if max_risk_level(chat_session.risk_level, level) == chat_session.risk_level:
+        return
+    # Conditional update so concurrent messages can only raise the level
+    lower_levels = RISK_LEVELS[:RISK_LEVELS.index(level)]
+    await db.execute(
+        update(ChatSession)
+        .where(
+            ChatSession.id == chat_session.id,
+            or_(ChatSession.risk_level.is_(None), ChatSession.risk_level.in_(lower_levels))
+        )
+        .values(risk_level=level)
+        .execution_options(synchronize_session=False)
+    )
+    set_committed_value(chat_session, "risk_level", level)
+
+# INSERT ... ON CONFLICT constructs of the supported backends
+DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# Columns written by the batch insert
+BATCH_INSERT_COLUMNS = ("session_id", "client_message_id", "content", "is_user", "sentiment", "timestamp", "created_at", "updated_at")
+
+async def _get_messages_by_client_id(db: AsyncSession, session_id: int, client_ids: List[str]) -> Dict[str, ChatMessage]:
+    result = await db.execute(
+        select(ChatMessage).where(
+            ChatMessage.session_id == session_id,
+            ChatMessage.client_message_id.in_(client_ids)
+        )
+    )
+    return {message.client_message_id: message for message in result.scalars()}
+
+async def _insert_message_batch(db: AsyncSession, chat_session: ChatSession, batch: List[ChatBatchMessage]) -> int:
+    """
+    Insert the batch messages not stored yet in one multi-row INSERT and commit.
+
+    Returns how many messages were inserted. Ids already stored are filtered
+    out first, so a plain retry stays read-only; a concurrent retry of the
+    same batch is absorbed by ON CONFLICT DO NOTHING on
+    uq_chat_messages_session_id_client_message_id, and only the rows this
+    request actually inserted count towards the session aggregates.
+    """
+    client_ids = [message.client_message_id for message in batch]
+    result = await db.execute(
+        select(ChatMessage.client_message_id).where(
+            ChatMessage.session_id == chat_session.id,
+            ChatMessage.client_message_id.in_(client_ids)
+        )
+    )
+    seen = set(result.scalars())
+
+    pending = []
+    for message in batch:
+        if message.client_message_id not in seen:
+            seen.add(message.client_message_id)
+            pending.append(message)
+    if not pending:
+        return 0
+
+    sentiments = sentiment_classifier.classify_many([message.content for message in pending])
+    # Spread created_at by a microsecond so the batch keeps its order in history and context
+    started = datetime.utcnow()
+    new_messages = []
+    for position, (message, sentiment) in enumerate(zip(pending, sentiments)):
+        created_at = started + timedelta(microseconds=position)
+        new_messages.append(ChatMessage(
+            session_id=chat_session.id,
+            client_message_id=message.client_message_id,
+            content=message.content,
+            is_user=True,
+            sentiment=sentiment,
+            timestamp=as_utc(created_at),
+            created_at=created_at,
+            updated_at=created_at
+        ))
+
+    insert_statement = DIALECT_INSERTS[db.bind.dialect.name](ChatMessage)
+    result = await db.execute(
+        insert_statement
+        .on_conflict_do_nothing(index_elements=["session_id", "client_message_id"])
+        .returning(ChatMessage.client_message_id),
+        [{column: getattr(message, column) for column in BATCH_INSERT_COLUMNS} for message in new_messages]
+    )
+    inserted_ids = set(result.scalars())
+    new_messages = [message for message in new_messages if message.client_message_id in inserted_ids]
+    if new_messages:
+        await _record_risk_level(db, chat_session, *(message.content for message in new_messages))
+        await db.execute(session_aggregates_update(chat_session.id, new_messages))
+    await db.commit()
+    return len(new_messages)
+
+async def _get_context(db: AsyncSession, chat_session: ChatSession, current_message: Optional[ChatMessage] = None) -> ConversationContext:
+    """Build the token-budgeted context from the turns before the current message (or all stored turns)."""
+    query = select(ChatMessage).where(ChatMessage.session_id == chat_session.id)
+    if current_message is not None:
+        query = query.where(ChatMessage.id != current_message.id)
+    result = await db.execute(
+        query.order_by(ChatMessage.created_at.desc()).limit(settings.CHAT_CONTEXT_MAX_MESSAGES)
+    )
+    return context_builder.build(chat_session.id, result.scalars().all())
+
+async def _get_message_stats(db: AsyncSession, session_ids: List[int]) -> dict:
+    """Return {session_id: (message_count, preview of the last message)} in two queries."""
+    if not session_ids:
+        return {}
+    result = await db.execute(
+        select(
+            ChatMessage.session_id,
+            func.count(ChatMessage.id),
+            func.max(ChatMessage.id)
+        ).where(
+            ChatMessage.session_id.in_(session_ids)
+        ).group_by(ChatMessage.session_id)
+    )
+    counts = result.all()
+
+    last_ids = [last_id for _, _, last_id in counts]
+    previews = {}
+    if last_ids:
+        result = await db.execute(
+            select(ChatMessage.id, ChatMessage.content).where(ChatMessage.id.in_(last_ids))
+        )
+        previews = dict(result.all())
+
+    return {
+        session_id: (count, (previews.get(last_id) or "")[:HISTORY_PREVIEW_LENGTH])
+        for session_id, count, last_id in counts
+    }
+
+async def _get_messages_by_session(db: AsyncSession, session_ids: List[int]) -> dict:
+    """Return {session_id: [message dict, ...]} for a page of sessions in one query, without ORM objects."""
+    if not session_ids:
+        return {}
+    result = await db.execute(
+        select(
+            ChatMessage.session_id,
+            ChatMessage.id,
+            ChatMessage.content,
+            ChatMessage.is_user,
+            ChatMessage.created_at.label("timestamp"),
+            ChatMessage.sentiment
+        ).where(
+            ChatMessage.session_id.in_(session_ids)
+        ).order_by(ChatMessage.session_id, ChatMessage.created_at)
+    )
+    messages = {}
+    for row in result.mappings():
+        message = dict(row)
+        messages.setdefault(message.pop("session_id"), []).append(message)
+    return messages
+
+def _filter_started_at(query, started_from: Optional[datetime], started_to: Optional[datetime]):
+    """Restrict a ChatSession query to a start-time range; served by ix_chat_sessions_user_id_started_at."""
+    if started_from is not None:
+        query = query.where(ChatSession.started_at >= as_utc(started_from))
+    if started_to is not None:
+        query = query.where(ChatSession.started_at < as_utc(started_to))
+    return query
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/message", response_model=ChatMessageResponse, dependencies=[Depends(security)])
+async def send_message(
+    message: ChatMessageCreate,
+    current_user: UserPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Store the user's message and the AI reply in two short transactions.
+
+    The first creates the session if needed, reads the context and inserts
+    the message; it is committed before the model is called, so no pooled
+    connection is held while waiting for the reply. The second inserts the
+    reply and updates the session aggregates and updated_at.
+    """
+    chat_session = await _get_or_create_active_session(db, current_user)
+    # Read before the insert, so the current message is not part of its own context
+    context = await _get_context(db, chat_session) if message.is_user else None
+    user_message = await _save_user_message(db, chat_session, message)
+    await db.commit()
+
+    if not message.is_user:
+        return user_message
+
+    ai_response = await chat_service.get_ai_response(message, context.turns, context.digest)
+    ai_message = await _insert_message(db, chat_session.id, content=ai_response, is_user=False)
+    await db.commit()
+    return ai_message
+
+@router.post("/messages/batch", response_model=ChatMessageBatchResponse, dependencies=[Depends(security)])
+async def send_message_batch(
+    batch: ChatMessageBatchCreate,
+    current_user: UserPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Store an ordered batch of user messages written offline and reply once.
+
+    Each message carries a client-generated id; ids already stored in the
+    session are skipped, so clients on flaky connections can resend the
+    whole batch until they get an answer. The AI reply answers the last
+    message, with the rest of the batch in its context, and is stored as
+    "<last client id>:reply", so a resent batch gets the same reply back.
+    """
+    chat_session = await _get_or_create_active_session(db, current_user)
+    session_id = chat_session.id
+    client_ids = list(dict.fromkeys(message.client_message_id for message in batch.messages))
+    inserted = await _insert_message_batch(db, chat_session, batch.messages)
+
+    stored = await _get_messages_by_client_id(db, session_id, client_ids)
+    messages = [ChatMessageResponse.model_validate(stored[client_id]) for client_id in client_ids]
+
+    reply_id = client_ids[-1] + REPLY_ID_SUFFIX
+    reply = (await _get_messages_by_client_id(db, session_id, [reply_id])).get(reply_id)
+    if reply is None:
+        last_message = stored[client_ids[-1]]
+        context = await _get_context(db, chat_session, last_message)
+        # End the read transaction so the connection goes back to the pool during the LLM call
+        await db.commit()
+        ai_response = await chat_service.get_ai_response(
+            ChatMessageCreate(content=last_message.content, is_user=True), context.turns, context.digest
         )
-        db.add(ai_message)
-        db.commit()
-        db.refresh(ai_message)
-        return ai_message
+        try:
+            reply = await _insert_message(
+                db, session_id, client_message_id=reply_id, content=ai_response, is_user=False
+            )
+            await db.commit()
+        except IntegrityError:
+            # Answered meanwhile by a concurrent retry of the same batch
+            await db.rollback()
+            reply = (await _get_messages_by_client_id(db, session_id, [reply_id]))[reply_id]
+
+    return ChatMessageBatchResponse(
+        session_id=session_id,
+        messages=messages,
+        duplicates=len(batch.messages) - inserted,
+        reply=ChatMessageResponse.model_validate(reply)
+    )
+
+@router.post("/message/stream", dependencies=[Depends(security)])
+async def stream_message(
+    message: ChatMessageCreate,
+    current_user: UserPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Same as POST /message, but the AI reply is sent as Server-Sent Events.
+
+    Emits one `token` event per content delta and a final `done` event with the
+    persisted message. The AI message is only written once the stream has
+    completed; if the client disconnects (the generator is cancelled) or the
+    model fails mid-stream, nothing is stored for the partial reply.
+    """
+    chat_session = await _get_or_create_active_session(db, current_user)
+    context = await _get_context(db, chat_session) if message.is_user else None
+    user_message = await _save_user_message(db, chat_session, message)
+    # Commit before streaming: the request-scoped session is only closed once the response ends
+    await db.commit()
+
+    if not message.is_user:
+        done = ChatMessageResponse.model_validate(user_message).model_dump(mode="json")
+        return StreamingResponse(iter([_sse("done", done)]), media_type="text/event-stream")
+
+    session_id = chat_session.id
+
+    async def event_stream():
+        chunks = []
+        try:
+            async for token in chat_service.stream_ai_response(message, context.turns, context.digest):
+                chunks.append(token)
+                yield _sse("token", {"content": token})
+        except Exception:
+            yield _sse("error", {"detail": "Falha ao gerar a resposta"})
+            return
 
-    return user_message
+        # The request-scoped session may already be closed once streaming starts
+        async with AsyncSessionLocal() as stream_db:
+            ai_message = await _insert_message(stream_db, session_id, content="".join(chunks), is_user=False)
+            await stream_db.commit()
+            done = ChatMessageResponse.model_validate(ai_message).model_dump(mode="json")
+        yield _sse("done", done)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/history", dependencies=[Depends(security)])
 async def get_chat_history(
     sort_order: str = Query("desc", regex="^(asc|desc)$"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(None, description="next_cursor returned by the previous page"),
+    include_messages: bool = Query(True, description="False returns only message counts and previews"),
+    started_from: Optional[datetime] = Query(None, description="Only sessions started at or after this time"),
+    started_to: Optional[datetime] = Query(None, description="Only sessions started before this time"),
+    current_user: UserPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(ChatSession).filter(
-        ChatSession.user_id == current_user.id
+    # Keyset pagination over the session id, which follows creation order
+    query = _filter_started_at(
+        select(ChatSession).where(ChatSession.user_id == current_user.id),
+        started_from,
+        started_to
     )
     
     if sort_order == "desc":
-        query = query.order_by(ChatSession.created_at.desc())
+        if cursor is not None:
+            query = query.where(ChatSession.id < cursor)
+        query = query.order_by(ChatSession.id.desc())
+    else:
+        if cursor is not None:
+            query = query.where(ChatSession.id > cursor)
+        query = query.order_by(ChatSession.id.asc())
+
+    result = await db.execute(query.limit(limit + 1))
+    sessions = result.scalars().all()
+    next_cursor = sessions[limit - 1].id if len(sessions) > limit else None
+    sessions = sessions[:limit]
+
+    session_ids = [session.id for session in sessions]
+    if include_messages:
+        # Load the messages of the whole page in one extra query
+        messages = await _get_messages_by_session(db, session_ids)
     else:
-        query = query.order_by(ChatSession.created_at.asc())
-        
-    sessions = query.all()
+        message_stats = await _get_message_stats(db, session_ids)
 
+    # Timestamps go out as UTC; clients render them in the user's timezone
     history = []
     for session in sessions:
-        messages = db.query(ChatMessage).filter(
-            ChatMessage.session_id == session.id
-        ).order_by(ChatMessage.created_at).all()
-        
-        # Convert UTC dates to local timezone
-        started_at = session.started_at
-        ended_at = session.ended_at
-        
-        if started_at:
-            started_at = datetime.fromisoformat(started_at)
-        if ended_at:
-            ended_at = datetime.fromisoformat(ended_at)
-        
-        history.append({
+        item = {
             "id": session.id,
-            "started_at": started_at,
-            "ended_at": ended_at,
+            "started_at": session.started_at,
+            "ended_at": session.ended_at,
             "sentiment_score": session.sentiment_score,
             "risk_level": session.risk_level,
-            "messages": [
-                {
-                    "id": msg.id,
-                    "content": msg.content,
-                    "is_user": msg.is_user,
-                    "timestamp": msg.created_at.replace(tzinfo=pytz.UTC).astimezone(tz).isoformat(),
-                    "sentiment": msg.sentiment
-                } for msg in messages
-            ]
-        })
-    
-    return {"sessions": history}
+        }
+        if include_messages:
+            item["messages"] = messages.get(session.id, [])
+        else:
+            item["message_count"], item["preview"] = message_stats.get(session.id, (0, None))
+        history.append(item)
+
+    return UTCJSONResponse({
+        "sessions": history,
+        "next_cursor": next_cursor,
+        "timezone": current_user.timezone or DEFAULT_TIMEZONE,
+        "locale": current_user.locale or DEFAULT_LOCALE,
+    })
 
 @router.get("/sessions", response_model=List[ChatSessionResponse], dependencies=[Depends(security)])
 async def get_chat_sessions(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    started_from: Optional[datetime] = Query(None, description="Only sessions started at or after this time"),
+    started_to: Optional[datetime] = Query(None, description="Only sessions started before this time"),
+    current_user: UserPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    sessions = db.query(ChatSession).filter(
-        ChatSession.user_id == current_user.id
-    ).all()
-    return sessions
+    result = await db.execute(
+        _filter_started_at(
+            select(ChatSession).where(ChatSession.user_id == current_user.id),
+            started_from,
+            started_to
+        )
+    )
+    return result.scalars().all()
 
 @router.post("/session/new", response_model=ChatSessionResponse)
 async def create_session(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
-    # Verificar se o usuário tem sessões disponíveis
-    if current_user.used_sessions >= current_user.available_sessions:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Você não tem mais sessões disponíveis. Por favor, adquira mais sessões para continuar."
-        )
-    
-    # Verificar se já existe uma sessão ativa
-    active_session = db.query(ChatSession).filter(
-        ChatSession.user_id == current_user.id,
-        ChatSession.is_active == True
-    ).first()
-    
-    if active_session:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Você já tem uma sessão ativa. Por favor, finalize a sessão atual antes de iniciar uma nova."
-        )
-    
-    # Criar nova sessão
-    new_session = ChatSession(user_id=current_user.id)
-    db.add(new_session)
-    
-    # Incrementar o contador de sessões usadas
-    current_user.used_sessions += 1
-    db.add(current_user)
-    
-    db.commit()
-    db.refresh(new_session)
-    
-    return new_session
+    # Idempotente: repetir a chamada devolve a sessão ativa sem consumir outra sessão
+    return await _reserve_session(db, current_user)
 
 @router.post("/session/{session_id}/end", response_model=ChatSessionResponse)
 async def end_session(
     session_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
-    session = db.query(ChatSession).filter(
-        ChatSession.id == session_id,
-        ChatSession.user_id == current_user.id
-    ).first()
+    session = await _get_user_session(db, session_id, current_user.id)
     
     if not session:
         raise HTTPException(
@@ -207,20 +553,20 @@ async def end_session(
     
     # End the session
     session.is_active = False
-    session.ended_at = func.now()
-    db.commit()
-    db.refresh(session)
+    session.ended_at = utcnow()
+    await db.commit()
+    await db.refresh(session)
+
+    # Generate the summary in the background so it is ready when opened
+    await db.run_sync(summary_service.enqueue_session_summary, session.id)
     return session
 
 @router.get("/session/active", response_model=ChatSessionResponse)
 async def get_active_session(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    session = db.query(ChatSession).filter(
-        ChatSession.user_id == current_user.id,
-        ChatSession.is_active == True
-    ).first()
+    session = await _get_active_session(db, current_user.id)
     
     if not session:
         raise HTTPException(
@@ -233,14 +579,11 @@ async def get_active_session(
 @router.get("/session/{session_id}/messages", response_model=List[ChatMessageResponse])
 async def get_session_messages(
     session_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Verificar se a sessão existe e pertence ao usuário
-    session = db.query(ChatSession).filter(
-        ChatSession.id == session_id,
-        ChatSession.user_id == current_user.id
-    ).first()
+    session = await _get_user_session(db, session_id, current_user.id)
     
     if not session:
         raise HTTPException(
@@ -248,57 +591,23 @@ async def get_session_messages(
             detail="Sessão não encontrada"
         )
     
-    # Buscar mensagens da sessão
-    messages = db.query(ChatMessage).filter(
-        ChatMessage.session_id == session_id
-    ).order_by(ChatMessage.created_at).all()
-    
-    # Converter timestamps para o fuso horário local
-    for message in messages:
-        if message.created_at:
-            message.created_at = message.created_at.replace(tzinfo=pytz.UTC).astimezone(tz)
-    
-    return messages
+    # Buscar mensagens da sessão; timestamps saem em UTC, sem passar por objetos ORM
+    result = await db.execute(
+        select(
+            ChatMessage.content,
+            ChatMessage.is_user,
+            ChatMessage.id,
+            ChatMessage.created_at
+        ).where(
+            ChatMessage.session_id == session_id
+        ).order_by(ChatMessage.created_at)
+    )
+    return UTCJSONResponse([dict(row) for row in result.mappings()])
 
 @router.post("/session/start", response_model=ChatSessionResponse, dependencies=[Depends(security)])
 async def start_session(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
-    # Verificar se o usuário tem sessões disponíveis
-    if current_user.used_sessions >= current_user.available_sessions:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Você não tem mais sessões disponíveis. Por favor, adquira mais sessões para continuar."
-        )
-    
-    # Verificar se já existe uma sessão ativa
-    active_session = db.query(ChatSession).filter(
-        ChatSession.user_id == current_user.id,
-        ChatSession.is_active == True
-    ).first()
-    
-    if active_session:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Você já tem uma sessão ativa. Por favor, finalize a sessão atual antes de iniciar uma nova."
-        )
-    
-    # Criar nova sessão
-    now = datetime.now(tz)
-    new_session = ChatSession(
-        user_id=current_user.id,
-        started_at=now.isoformat(),
-        created_at=now,
-        is_active=True
-    )
-    db.add(new_session)
-    
-    # Incrementar o contador de sessões usadas
-    current_user.used_sessions += 1
-    db.add(current_user)
-    
-    db.commit()
-    db.refresh(new_session)
-    
-    return new_session 
\ No newline at end of file
+    # Idempotente: repetir a chamada devolve a sessão ativa sem consumir outra sessão
+    return await _reserve_session(db, current_user)
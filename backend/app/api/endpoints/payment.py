@@ -1,21 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import mercadopago
-from app.core.database import get_db
-from app.core.security import get_current_user
-from app.models.user import User
+from app.core.config import settings
+from app.core.database import get_async_db, get_db
+from app.core.security import get_current_principal
+from app.schemas.user import UserPrincipal
+from app.services.payments import PAYMENT_ACTIONS, record_payment_notification
 import os
 
 from app.models.session_bundle import SessionBundle
 
 router = APIRouter()
-sdk = mercadopago.SDK(os.getenv("MERCADOPAGO_ACCESS_TOKEN"))
+sdk = mercadopago.SDK(settings.MERCADOPAGO_ACCESS_TOKEN)
 
+# Sync def: the SDK call blocks, so FastAPI runs it in the threadpool
 @router.post("/create")
-async def create_payment(
+def create_payment(
     bundle_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     # Get session price from your predefined prices
     bundle = db.query(SessionBundle).filter(
@@ -69,8 +73,15 @@ async def create_payment(
 @router.post("/webhook")
 async def handle_webhook(
     data: dict,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
+    """
+    Record the notification and acknowledge it right away.
+
+    Mercado Pago retries notifications that are not answered quickly, so the
+    payment is fetched and credited by a background job; duplicates of the
+    same payment id are folded into one inbox row and one job.
+    """
     if "topic" in data:
         if data["topic"] == "merchant_order":
             # Handle payment events
@@ -78,17 +89,8 @@ async def handle_webhook(
         else:
             raise HTTPException(status_code=400, detail="Invalid topic")
 
-    if data["type"] == "payment" and data["action"] == "payment.created":
-        payment = sdk.payment().get(data["data"]["id"])
-        payment_info = payment["response"]
+    if data.get("type") == "payment" and data.get("action") in PAYMENT_ACTIONS:
+        payment_id = str(data["data"]["id"])
+        await db.run_sync(record_payment_notification, payment_id, data)
 
-        if payment_info["status"] == "approved":
-            user_id = payment_info["metadata"]["user_id"]
-            session_quantity = payment_info["metadata"]["session_quantity"]
-            
-            user = db.query(User).filter(User.id == user_id).first()
-            if user:
-                user.available_sessions += session_quantity
-                db.commit()
-    
-    return {"status": "success"}
\ No newline at end of file
+    return {"status": "success"}
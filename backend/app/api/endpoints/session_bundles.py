@@ -1,31 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.database import get_async_db
+from app.core.response_cache import SESSION_BUNDLES_KEY, cached_json_response, invalidate_session_bundles
+from app.core.security import get_current_principal
 from app.models.session_bundle import SessionBundle
 from app.schemas.session_bundle import SessionBundleCreate, SessionBundle as SessionBundleSchema
-from app.models.user import User
+from app.schemas.user import UserPrincipal
 
 router = APIRouter()
 
 @router.get("/", response_model=List[SessionBundleSchema])
 async def list_bundles(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
-    bundles = db.query(SessionBundle).filter(SessionBundle.is_active == True).order_by(SessionBundle.quantity).all()
-    return bundles
+    async def load_bundles():
+        result = await db.execute(
+            select(SessionBundle).where(SessionBundle.is_active == True).order_by(SessionBundle.quantity)
+        )
+        return [SessionBundleSchema.model_validate(bundle) for bundle in result.scalars().all()]
+
+    return await cached_json_response(request, SESSION_BUNDLES_KEY, load_bundles)
 
 @router.post("/", response_model=SessionBundleSchema)
 async def create_bundle(
     bundle: SessionBundleCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     # TODO: Add admin check here
     db_bundle = SessionBundle(**bundle.dict())
     db.add(db_bundle)
-    db.commit()
-    db.refresh(db_bundle)
+    await db.commit()
+    await db.refresh(db_bundle)
+    await invalidate_session_bundles()
     return db_bundle
\ No newline at end of file
@@ -1,22 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
-from app.core.database import get_db
-from app.schemas.summary import SessionSummaryResponse
+from app.core.database import get_async_db, get_db
+from app.core.response_cache import cached_json_response, summary_cache_key
+from app.schemas.summary import SessionSummaryResponse, SummaryJobStatus
 from app.services import summary as summary_service
-from app.core.security import get_current_user
-from app.models.user import User
-from app.models.chat import ChatSession
-import json
+from app.core.security import get_current_principal
+from app.schemas.user import UserPrincipal
+from app.models.chat import ChatSession, SessionSummary
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 @router.get("/sessions/{session_id}/summary", response_model=SessionSummaryResponse)
-def get_summary(
+async def get_summary(
+    session_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_principal)
+):
+    async def load_summary():
+        # Verify session exists and belongs to user
+        result = await db.execute(
+            select(ChatSession.id).where(
+                ChatSession.id == session_id,
+                ChatSession.user_id == current_user.id
+            )
+        )
+        if result.scalar() is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        
+        # Get existing summary
+        result = await db.execute(
+            select(SessionSummary).where(SessionSummary.session_id == session_id)
+        )
+        db_summary = result.scalars().first()
+        
+        if not db_summary:
+            raise HTTPException(status_code=404, detail="Summary not found")
+        
+        return SessionSummaryResponse.model_validate(db_summary)
+
+    return await cached_json_response(request, summary_cache_key(current_user.id, session_id), load_summary)
+
+@router.post("/sessions/{session_id}/summary", response_model=SummaryJobStatus, status_code=202)
+def create_summary(
     session_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
+    """
+    Schedule summary generation for a session.
+
+    Generation runs in the background job workers; poll
+    GET /sessions/{session_id}/summary/status and fetch the summary once the
+    status is `succeeded`. Calling this again for the same session is a no-op,
+    except that a failed job is retried.
+    """
     # Verify session exists and belongs to user
     session = db.query(ChatSession).filter(
         ChatSession.id == session_id,
@@ -25,35 +67,16 @@ def get_summary(
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Get existing summary
-    db_summary = summary_service.get_session_summary(db, session_id)
-    
-    if not db_summary:
-        raise HTTPException(status_code=404, detail="Summary not found")
-    
-    # Converter key_topics de JSON string para lista
-    if db_summary.key_topics:
-        db_summary.key_topics = json.loads(db_summary.key_topics)
-    
-    # Converter suggestions de JSON string para lista
-    if db_summary.suggestions:
-        db_summary.suggestions = json.loads(db_summary.suggestions)
+    if not summary_service.get_session_summary(db, session_id):
+        summary_service.enqueue_session_summary(db, session_id, retry_failed=True)
     
-    # Converter progress_observations de JSON string para lista
-    if db_summary.progress_observations:
-        db_summary.progress_observations = json.loads(db_summary.progress_observations)
+    return summary_service.get_summary_job_status(db, session_id)
 
-    # Garantir que risk_level não seja None
-    if db_summary.risk_level is None:
-        db_summary.risk_level = "low"  # valor padrão
-    
-    return db_summary
-
-@router.post("/sessions/{session_id}/summary", response_model=SessionSummaryResponse)
-def create_summary(
+@router.get("/sessions/{session_id}/summary/status", response_model=SummaryJobStatus)
+def get_summary_status(
     session_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     # Verify session exists and belongs to user
     session = db.query(ChatSession).filter(
@@ -63,42 +86,13 @@ def create_summary(
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Check if summary already exists
-    existing_summary = summary_service.get_session_summary(db, session_id)
-    if existing_summary:
-        raise HTTPException(
-            status_code=400,
-            detail="Summary already exists for this session"
-        )
-    
-    # Create new summary
-    db_summary = summary_service.create_session_summary(db, session_id)
-    if not db_summary:
-        raise HTTPException(status_code=500, detail="Failed to generate summary")
-    
-    # Converter key_topics de JSON string para lista
-    if db_summary.key_topics:
-        db_summary.key_topics = json.loads(db_summary.key_topics)
-    
-    # Converter suggestions de JSON string para lista
-    if db_summary.suggestions:
-        db_summary.suggestions = json.loads(db_summary.suggestions)
-    
-    # Converter progress_observations de JSON string para lista
-    if db_summary.progress_observations:
-        db_summary.progress_observations = json.loads(db_summary.progress_observations)
-
-    # Garantir que risk_level não seja None
-    if db_summary.risk_level is None:
-        db_summary.risk_level = "low"  # valor padrão
-    
-    return db_summary
+    return summary_service.get_summary_job_status(db, session_id)
 
 @router.get("/sessions/{session_id}/metrics")
 def get_session_metrics(
     session_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     # Verify session exists and belongs to user
     session = db.query(ChatSession).filter(
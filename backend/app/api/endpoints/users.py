@@ -1,27 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.database import get_async_db, get_db
+from app.core.security import get_current_principal
 from app.models.user import User
-from app.schemas.user import UserCreate, UserResponse, UserSessionsResponse
+from app.schemas.user import (
+    UserCreate,
+    UserPreferences,
+    UserPreferencesUpdate,
+    UserPrincipal,
+    UserResponse,
+    UserSessionsResponse
+)
 from app.services.user_service import create_user, get_user_by_email
 
 router = APIRouter()
 
 @router.post("/", response_model=UserResponse)
-def create_user_endpoint(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = get_user_by_email(db, email=user.email)
+async def create_user_endpoint(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    return create_user(db=db, user=user)
+    return await create_user(db=db, user=user)
 
 @router.get("/", response_model=list[UserResponse])
 def get_users(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     users = db.query(User).all()
     return users
@@ -29,19 +37,41 @@ def get_users(
 @router.get("/sessions", response_model=UserSessionsResponse)
 def get_user_sessions(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     """Get available and used sessions for the current user"""
-    return {
-        "available_sessions": current_user.available_sessions,
-        "used_sessions": current_user.used_sessions
-    }
+    # Read from the database: the cached principal may predate a credit or reservation
+    # made by another worker, and clients use this to decide whether to start a session
+    return db.query(User.available_sessions, User.used_sessions).filter(User.id == current_user.id).one()
+
+@router.get("/me/preferences", response_model=UserPreferences)
+def get_user_preferences(
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_principal)
+):
+    """Get the timezone and locale the client should display timestamps in"""
+    return db.query(User).filter(User.id == current_user.id).first()
+
+@router.put("/me/preferences", response_model=UserPreferences)
+def update_user_preferences(
+    preferences: UserPreferencesUpdate,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_principal)
+):
+    """Update the timezone and/or locale of the current user"""
+    user = db.query(User).filter(User.id == current_user.id).first()
+    for field, value in preferences.model_dump(exclude_none=True).items():
+        setattr(user, field, value)
+    # The cached principal is dropped by the User after_update listener
+    db.commit()
+    db.refresh(user)
+    return user
 
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
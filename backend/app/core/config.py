@@ -8,14 +8,83 @@ load_dotenv()
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    DB_POOL_SIZE: int = 10  # Persistent connections per worker
+    DB_MAX_OVERFLOW: int = 20  # Extra connections opened under bursts
+    DB_POOL_TIMEOUT: float = 10.0  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Replace connections older than this (seconds)
+    DB_POOL_PRE_PING: bool = True  # Detect connections dropped by a database restart
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # Postgres statement_timeout, 0 disables
+    DB_APPLICATION_NAME: str = "lumen-api"
     
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_TTL_SECONDS: float = 60.0  # Max staleness of cached principals across workers
+    AUTH_CACHE_MAX_SIZE: int = 10000
+    BCRYPT_ROUNDS: int = 12  # Changing it rehashes passwords on their next login
+    PASSWORD_HASH_WORKERS: int = 4  # Threads hashing/verifying passwords off the event loop
+    
+    # Response cache
+    RESPONSE_CACHE_BACKEND: str = "memory"  # "memory" (per worker) or "redis" (shared, needs the redis package)
+    RESPONSE_CACHE_REDIS_URL: Optional[str] = None
+    RESPONSE_CACHE_TTL_SECONDS: float = 300.0
+    RESPONSE_CACHE_MAX_SIZE: int = 5000
     
     # OpenAI
-    OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
+    OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"
+    
+    # Mercado Pago
+    MERCADOPAGO_ACCESS_TOKEN: Optional[str] = os.getenv("MERCADOPAGO_ACCESS_TOKEN")
+    MERCADOPAGO_API_URL: str = "https://api.mercadopago.com"  # Point at benchmarks.fake_mercadopago locally
+    MERCADOPAGO_TIMEOUT_SECONDS: float = 10.0
+    
+    # LLM client
+    LLM_MAX_CONCURRENCY: int = 16  # In-flight completions per worker
+    LLM_MAX_CONNECTIONS: int = 32  # Pooled HTTP connections per worker
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    LLM_PROVIDER: str = "openai"  # "openai" or "mock" (deterministic, offline)
+    LLM_MOCK_LATENCY_MS: float = 0.0  # Simulated time to first token of the mock provider
+    LLM_MOCK_TOKEN_DELAY_MS: float = 0.0  # Simulated gap between streamed words
+    LLM_CASSETTE_MODE: Optional[str] = None  # "record" or "replay" interactions in LLM_CASSETTE_PATH
+    LLM_CASSETTE_PATH: Optional[str] = None
+    LLM_CASSETTE_REPLAY_LATENCY: bool = False  # Reproduce recorded latencies when replaying
+    
+    # Models per route
+    LLM_CHAT_MODEL: str = "gpt-3.5-turbo"
+    LLM_SUMMARY_MODEL: str = "gpt-3.5-turbo"
+    LLM_ANALYSIS_MODEL: str = "gpt-4.5-preview"  # AIService sentiment analysis and replies
+    
+    # Chat context
+    CHAT_CONTEXT_TOKEN_BUDGET: int = 2000  # Prompt tokens for history, digest included
+    CHAT_DIGEST_TOKEN_BUDGET: int = 300  # Share of the budget kept for the running digest
+    CHAT_CONTEXT_MAX_MESSAGES: int = 40  # Recent messages fetched per turn
+    
+    # Semantic response cache for repeated openers ("oi", "estou ansioso"...)
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.9  # Minimum cosine similarity to reuse a reply
+    SEMANTIC_CACHE_TTL_SECONDS: float = 3600.0
+    SEMANTIC_CACHE_MAX_SIZE: int = 2000
+    SEMANTIC_CACHE_MAX_TURNS: int = 0  # Only cache messages with at most this many previous turns
+    
+    # Risk detection
+    RISK_LEXICON_PATH: Optional[str] = None  # Defaults to app/data/risk_lexicon.json
+    RISK_LEXICON_RELOAD_SECONDS: float = 5.0  # How often the lexicon file is checked for changes
+    
+    # Sentiment classification
+    SENTIMENT_SEED_PATH: Optional[str] = None  # Defaults to app/data/sentiment_seed.json
+    SENTIMENT_BATCH_SIZE: int = 500  # Messages per batch in the backfill command
+    
+    # Background jobs
+    JOB_WORKERS_ENABLED: bool = True
+    JOB_WORKER_CONCURRENCY: int = 2
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 10.0  # Doubles on every failed attempt
+    JOB_RETRY_MAX_SECONDS: float = 3600.0
+    JOB_LOCK_TIMEOUT_SECONDS: float = 300.0  # Running jobs older than this are reclaimed
     
     # FastAPI/Uvicorn settings
     HOST: str = "0.0.0.0"
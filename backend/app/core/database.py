@@ -1,16 +1,159 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from dotenv import load_dotenv
+import threading
+import time
+from app.core.config import settings
 
 load_dotenv()
 
-SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+class PoolMetrics:
+    """Counters for connection checkouts: time spent waiting for one and time it was held."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.checkins = 0
+        self.hold_seconds_total = 0.0
+        self.hold_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_hold(self, seconds: float) -> None:
+        with self._lock:
+            self.checkins += 1
+            self.hold_seconds_total += seconds
+            self.hold_seconds_max = max(self.hold_seconds_max, seconds)
+
+    def snapshot(self, pool) -> dict:
+        data = {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_avg": self.wait_seconds_total / self.checkouts if self.checkouts else 0.0,
+            "wait_seconds_max": self.wait_seconds_max,
+            "hold_seconds_avg": self.hold_seconds_total / self.checkins if self.checkins else 0.0,
+            "hold_seconds_max": self.hold_seconds_max,
+        }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return data
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+class _InstrumentedPoolMixin:
+    """Records how long each checkout waited for a connection (including pre-ping) and how long it was held."""
+    metrics: PoolMetrics
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    metrics = pool_metrics
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    metrics = async_pool_metrics
+
+# Async drivers for the sync URLs used everywhere else
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def _is_memory_sqlite(database_url) -> bool:
+    return database_url.get_backend_name() == "sqlite" and database_url.database in (None, "", ":memory:")
+
+def _async_database_url(url: str):
+    database_url = make_url(url)
+    return database_url.set(drivername=ASYNC_DRIVERS[database_url.get_backend_name()])
+
+def _engine_options(url: str, use_async: bool = False) -> dict:
+    database_url = make_url(url)
+    if _is_memory_sqlite(database_url):
+        # In-memory SQLite keeps its default single-connection pool
+        return {}
+
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool if use_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if database_url.get_backend_name() == "postgresql":
+        if use_async:
+            # asyncpg takes server settings instead of libpq options
+            server_settings = {"application_name": settings.DB_APPLICATION_NAME}
+            if settings.DB_STATEMENT_TIMEOUT_MS:
+                server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+            options["connect_args"] = {"server_settings": server_settings}
+        else:
+            connect_args = {"application_name": settings.DB_APPLICATION_NAME}
+            if settings.DB_STATEMENT_TIMEOUT_MS:
+                connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+            options["connect_args"] = connect_args
+    return options
+
+def _record_hold_times(engine) -> None:
+    """Time each connection from checkout to checkin through the pool events of an instrumented engine."""
+    if not isinstance(engine.pool, _InstrumentedPoolMixin):
+        return
+    metrics = engine.pool.metrics
+
+    # Engine-level listeners are carried over when engine.dispose() recreates the pool
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            metrics.record_hold(time.perf_counter() - checked_out_at)
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options(SQLALCHEMY_DATABASE_URL))
+_record_hold_times(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the async route handlers, so queries don't block the event loop
+async_engine = create_async_engine(
+    _async_database_url(SQLALCHEMY_DATABASE_URL),
+    **_engine_options(SQLALCHEMY_DATABASE_URL, use_async=True)
+)
+_record_hold_times(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 # Dependency
@@ -19,4 +162,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,77 @@
+import hashlib
+from typing import Any, Awaitable, Callable
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.core.cache import CacheBackend, MemoryCacheBackend, RedisCacheBackend
+from app.core.config import settings
+
+
+def create_cache_backend() -> CacheBackend:
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        if not settings.RESPONSE_CACHE_REDIS_URL:
+            raise RuntimeError("RESPONSE_CACHE_REDIS_URL must be set to use the redis cache backend")
+        return RedisCacheBackend(settings.RESPONSE_CACHE_REDIS_URL, ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+    if settings.RESPONSE_CACHE_BACKEND != "memory":
+        raise RuntimeError(f"Unknown RESPONSE_CACHE_BACKEND: {settings.RESPONSE_CACHE_BACKEND}")
+    return MemoryCacheBackend(maxsize=settings.RESPONSE_CACHE_MAX_SIZE, ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+response_cache = create_cache_backend()
+
+SESSION_BUNDLES_KEY = "session_bundles:active"
+
+
+def summary_cache_key(user_id: int, session_id: int) -> str:
+    # Scoped by user, so a hit implies the ownership check already passed once
+    return f"summary:{user_id}:{session_id}"
+
+
+async def invalidate_summary(user_id: int, session_id: int) -> None:
+    await response_cache.delete(summary_cache_key(user_id, session_id))
+
+
+async def invalidate_session_bundles() -> None:
+    await response_cache.delete(SESSION_BUNDLES_KEY)
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Weak validators are fine for GET; compare the opaque tags only
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+
+async def cached_json_response(
+    request: Request,
+    key: str,
+    build: Callable[[], Awaitable[Any]],
+) -> Response:
+    """
+    Serve a JSON body from the response cache, building and storing it on a miss.
+
+    The ETag is derived from the body, so clients revalidating with
+    If-None-Match get a bodiless 304 while the content is unchanged.
+    """
+    body = await response_cache.get(key)
+    if body is None:
+        body = orjson.dumps(await build(), default=_orjson_default)
+        await response_cache.set(key, body)
+
+    etag = _etag(body)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
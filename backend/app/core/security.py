@@ -1,35 +1,118 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.observability import PASSWORD_HASH_DURATION, span
 from app.models.user import User
 from app.schemas.token import TokenData
+from app.schemas.user import UserPrincipal
+import asyncio
 import os
+import time
+
+T = TypeVar("T")
 
 # Security configuration
 SECRET_KEY = os.getenv("SECRET_KEY")  # In production, use environment variable
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min == max rounds makes passlib flag hashes of any other cost for an update,
+# so changing BCRYPT_ROUNDS rehashes passwords on the next successful login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+# bcrypt releases the GIL, so hashing in threads keeps the event loop free
+# and runs up to PASSWORD_HASH_WORKERS hashes in parallel. Created on first
+# use and dropped on shutdown, so an app started again gets a fresh pool.
+_password_hash_executor: Optional[ThreadPoolExecutor] = None
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Verified principals keyed by token subject (email). Entries are dropped when
+# the user row is updated in this process; the TTL bounds staleness for
+# updates made by other workers.
+principal_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_principal(mapper, connection, target: User) -> None:
+    invalidate_principal(target.email)
+
+def invalidate_principal(email: str) -> None:
+    principal_cache.delete(email)
+
+def _get_password_hash_executor() -> ThreadPoolExecutor:
+    global _password_hash_executor
+    if _password_hash_executor is None:
+        _password_hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash"
+        )
+    return _password_hash_executor
+
+def shutdown_password_hash_executor() -> None:
+    global _password_hash_executor
+    if _password_hash_executor is not None:
+        _password_hash_executor.shutdown(wait=False)
+        _password_hash_executor = None
+
+def _timed_hash_operation(operation: str, func: Callable[..., T], *args) -> T:
+    started = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        PASSWORD_HASH_DURATION.observe(time.perf_counter() - started, operation=operation)
+
+async def _run_hash_operation(operation: str, func: Callable[..., T], *args) -> T:
+    """Run a bcrypt call on the hashing pool; the span includes time queued for a worker."""
+    loop = asyncio.get_running_loop()
+    with span("bcrypt"):
+        return await loop.run_in_executor(
+            _get_password_hash_executor(), _timed_hash_operation, operation, func, *args
+        )
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    """Blocking; for sync code paths only. Async code uses authenticate_user."""
+    with span("bcrypt"):
+        return _timed_hash_operation("verify", pwd_context.verify, plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    """Blocking; for sync code paths only. Async code uses hash_password."""
+    with span("bcrypt"):
+        return _timed_hash_operation("hash", pwd_context.hash, password)
+
+async def hash_password(password: str) -> str:
+    return await _run_hash_operation("hash", pwd_context.hash, password)
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    user = db.query(User).filter(User.email == email).first()
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalars().first()
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = await _run_hash_operation(
+        "verify", pwd_context.verify_and_update, password, user.hashed_password
+    )
+    if not verified:
         return None
+    if new_hash:
+        # Stored with a different cost than BCRYPT_ROUNDS; upgrade it transparently
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -42,7 +125,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def create_user_access_token(user: User, expires_delta: Optional[timedelta] = None) -> str:
+    """Create an access token carrying the user's id alongside the email subject."""
+    return create_access_token(
+        data={"sub": user.email, "uid": user.id}, expires_delta=expires_delta
+    )
+
+def decode_access_token(token: str = Depends(oauth2_scheme)) -> TokenData:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -53,10 +142,44 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-        token_data = TokenData(email=email)
+        return TokenData(email=email, user_id=payload.get("uid"))
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.email == token_data.email).first()
+
+async def _load_user(db: AsyncSession, token_data: TokenData) -> User:
+    if token_data.user_id is not None:
+        user = await db.get(User, token_data.user_id)
+        if user is not None and user.email != token_data.email:
+            user = None
+    else:
+        result = await db.execute(select(User).where(User.email == token_data.email))
+        user = result.scalars().first()
     if user is None:
-        raise credentials_exception
-    return user 
\ No newline at end of file
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+async def get_current_principal(
+    token_data: TokenData = Depends(decode_access_token),
+    db: AsyncSession = Depends(get_async_db)
+) -> UserPrincipal:
+    """
+    Resolve the authenticated user for read-only routes.
+
+    Served from the principal cache when possible, so no query is issued;
+    routes that modify the user must use `get_current_user` instead.
+    """
+    principal = principal_cache.get(token_data.email)
+    if principal is None:
+        principal = UserPrincipal.model_validate(await _load_user(db, token_data))
+        principal_cache.set(token_data.email, principal)
+    return principal
+
+async def get_current_user(
+    token_data: TokenData = Depends(decode_access_token),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    return await _load_user(db, token_data)
@@ -0,0 +1,45 @@
+from datetime import datetime, timezone, tzinfo
+from functools import lru_cache
+from typing import Annotated, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import AfterValidator
+
+DEFAULT_TIMEZONE = "America/Sao_Paulo"
+DEFAULT_LOCALE = "pt-BR"
+
+
+def utcnow() -> datetime:
+    """Current time as an aware UTC datetime, the form every timestamp is stored in."""
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Return `value` as aware UTC; naive values (e.g. read back from SQLite) are taken as UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+@lru_cache(maxsize=128)
+def get_zone(name: Optional[str]) -> tzinfo:
+    """Resolve an IANA timezone name once per process; None means the app default."""
+    try:
+        return ZoneInfo(name or DEFAULT_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise ValueError(f"Unknown timezone: {name}") from exc
+
+
+# Response field type: always serialized with an explicit UTC offset
+UTCDateTime = Annotated[datetime, AfterValidator(as_utc)]
+
+
+class UTCJSONResponse(ORJSONResponse):
+    """orjson response that writes naive datetimes as UTC with a trailing Z, without per-value conversion."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z)
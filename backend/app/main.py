@@ -1,23 +1,33 @@
 from dotenv import load_dotenv
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.security import OAuth2PasswordRequestForm, HTTPBearer
 from sqlalchemy.orm import Session
 from typing import Annotated
 from app.api.api import api_router
-from app.core.database import engine, Base, get_db
+from app.core.database import engine, async_engine, Base, get_db, pool_metrics, async_pool_metrics
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse
 from app.schemas.token import Token
 from app.services.user_service import create_user, get_user_by_email
+from app.services.llm_providers import llm_provider
+from app.core.security import principal_cache
+from app.core.response_cache import response_cache
+from app.core.observability import TimingMiddleware, metrics_registry
+from app.core.config import settings
+from app.services.jobs import job_worker
+from app.services.risk_detector import risk_detector
+from app.services.sentiment import sentiment_classifier
+from app.services.semantic_cache import semantic_cache
 from app.core.security import (
     authenticate_user,
     create_access_token,
     get_current_user,
+    shutdown_password_hash_executor,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from datetime import datetime, timedelta
-from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 import os
 
@@ -29,9 +39,6 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # OAuth2 scheme
 user_oauth2 = OAuth2PasswordBearer(
     tokenUrl="/api/v1/login/access-token",
@@ -59,14 +66,86 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# Outermost, so the timing covers CORS and routing too
+app.add_middleware(TimingMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix="/api")
 
+@app.on_event("startup")
+async def load_risk_lexicon():
+    # Fail fast on a broken lexicon instead of on the first message
+    risk_detector.load()
+
+@app.on_event("startup")
+async def load_sentiment_classifier():
+    sentiment_classifier.load()
+
+@app.on_event("startup")
+async def connect_async_engine():
+    # The first connection of a fresh pool initializes the dialect while holding
+    # a thread lock; concurrent first requests would block the event loop on it
+    async with async_engine.connect():
+        pass
+
+@app.on_event("startup")
+async def start_job_workers():
+    if settings.JOB_WORKERS_ENABLED:
+        job_worker.start()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    await job_worker.stop()
+
+@app.on_event("shutdown")
+async def close_llm_provider():
+    await llm_provider.aclose()
+
+@app.on_event("shutdown")
+def stop_password_hash_workers():
+    shutdown_password_hash_executor()
+
+@app.on_event("shutdown")
+async def close_response_cache():
+    await response_cache.aclose()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
 # Health check endpoint
 @app.get("/health")
 def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
 
+# Authentication cache statistics
+@app.get("/health/auth-cache")
+def auth_cache_stats():
+    return principal_cache.stats()
+
+# Response cache statistics
+@app.get("/health/response-cache")
+def response_cache_stats():
+    return response_cache.stats()
+
+# Semantic (LLM reply) cache statistics
+@app.get("/health/semantic-cache")
+def semantic_cache_stats():
+    return semantic_cache.stats()
+
+# Database connection pool statistics
+@app.get("/health/db")
+def db_pool_stats():
+    return {
+        "sync": pool_metrics.snapshot(engine.pool),
+        "async": async_pool_metrics.snapshot(async_engine.pool),
+    }
+
+# Prometheus metrics for this worker
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
 # Root endpoint
 @app.get("/")
 def root():
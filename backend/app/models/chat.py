@@ -1,22 +1,48 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Float, Index, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.core.timezones import utcnow
 from datetime import datetime
 
+# JSONB on PostgreSQL, JSON (stored as text) elsewhere
+JSONList = JSON().with_variant(JSONB(), "postgresql")
+
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
-    started_at = Column(String)  # ISO format datetime
-    ended_at = Column(String)  # ISO format datetime
+    started_at = Column(DateTime(timezone=True), default=utcnow)
+    ended_at = Column(DateTime(timezone=True))
     sentiment_score = Column(String)  # Will store JSON with sentiment analysis
     risk_level = Column(String)  # low, medium, high
-    messages = relationship("ChatMessage", back_populates="session") # relationship to ChatMessage
+    messages = relationship("ChatMessage", back_populates="session", order_by="ChatMessage.created_at") # relationship to ChatMessage
     summary = relationship("SessionSummary", back_populates="session", uselist=False)
     is_active = Column(Boolean, default=True) # if the session is active
     created_at = Column(DateTime, default=datetime.utcnow) # datetime of creation
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow) # datetime of last update
+    # Running aggregates, updated on every message insert
+    message_count = Column(Integer, nullable=False, default=0, server_default="0")
+    positive_count = Column(Integer, nullable=False, default=0, server_default="0")
+    negative_count = Column(Integer, nullable=False, default=0, server_default="0")
+    neutral_count = Column(Integer, nullable=False, default=0, server_default="0")
+    token_count = Column(Integer, nullable=False, default=0, server_default="0") # estimated tokens of all messages
+    first_message_at = Column(DateTime)
+    last_message_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_chat_sessions_user_id_is_active", "user_id", "is_active"),
+        Index("ix_chat_sessions_user_id_started_at", "user_id", "started_at"),
+        # At most one active session per user
+        Index(
+            "uq_chat_sessions_user_id_active",
+            "user_id",
+            unique=True,
+            postgresql_where=text("is_active = true"),
+            sqlite_where=text("is_active = 1"),
+        ),
+    )
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
@@ -25,22 +51,29 @@ class ChatMessage(Base):
     session_id = Column(Integer, ForeignKey("chat_sessions.id"))
     content = Column(Text)
     is_user = Column(Boolean)  # True if message is from user, False if from AI
-    timestamp = Column(String)  # ISO format datetime
+    timestamp = Column(DateTime(timezone=True), default=utcnow)
     sentiment = Column(String)  # positive, negative, neutral
+    client_message_id = Column(String)  # client-generated id of batched messages, dedupes retries
     session = relationship("ChatSession", back_populates="messages") 
     created_at = Column(DateTime, default=datetime.utcnow) # datetime of creation
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow) # datetime of last update
 
+    __table_args__ = (
+        Index("ix_chat_messages_session_id_created_at", "session_id", "created_at"),
+        # NULLs are distinct, so only messages sent with a client id are constrained
+        Index("uq_chat_messages_session_id_client_message_id", "session_id", "client_message_id", unique=True),
+    )
+
 class SessionSummary(Base):
     __tablename__ = "session_summaries"
     
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(Integer, ForeignKey("chat_sessions.id"))
+    session_id = Column(Integer, ForeignKey("chat_sessions.id"), index=True)
     overall_sentiment = Column(String)
     risk_level = Column(String)
-    key_topics = Column(String)  # Store as JSON
-    suggestions = Column(String)  # Store as JSON
-    progress_observations = Column(String)  # Store as JSON
+    key_topics = Column(JSONList)  # list of strings
+    suggestions = Column(JSONList)  # list of strings
+    progress_observations = Column(JSONList)  # list of strings
     message_count = Column(Integer)
     duration_minutes = Column(Float)
     summary_text = Column(Text)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index, UniqueConstraint
+from app.core.database import Base
+from datetime import datetime
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # handler name, e.g. session_summary
+    dedupe_key = Column(String, nullable=False)  # at most one job per (kind, dedupe_key)
+    payload = Column(JSON)
+    status = Column(String, nullable=False, default="pending")  # pending, running, succeeded, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_after = Column(DateTime, default=datetime.utcnow)  # earliest time the job may run
+    locked_at = Column(DateTime)  # when a worker claimed the job
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("kind", "dedupe_key", name="uq_jobs_kind_dedupe_key"),
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from app.core.database import Base
+from app.core.timezones import utcnow
+
+class PaymentInbox(Base):
+    """Durable inbox of Mercado Pago payment notifications, one row per payment id."""
+    __tablename__ = "payment_inbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    payment_id = Column(String, nullable=False, unique=True)  # Mercado Pago payment id, dedupes retries
+    status = Column(String, nullable=False, default="received")  # received, then the last fetched payment status
+    notification_count = Column(Integer, nullable=False, default=1)
+    last_notification = Column(JSON)  # raw webhook body, for auditing
+    user_id = Column(Integer, ForeignKey("users.id"))
+    session_quantity = Column(Integer)
+    credited_at = Column(DateTime(timezone=True))  # set exactly once, in the transaction that credits the user
+    created_at = Column(DateTime(timezone=True), default=utcnow)
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
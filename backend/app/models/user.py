@@ -1,6 +1,7 @@
 from sqlalchemy import Boolean, Column, Integer, String, DateTime
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.core.timezones import DEFAULT_LOCALE, DEFAULT_TIMEZONE
 
 class User(Base):
     __tablename__ = "users"
@@ -14,4 +15,6 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     available_sessions = Column(Integer, default=1)  # Número de sessões disponíveis
     used_sessions = Column(Integer, default=0)  # Número de sessões já utilizadas
-    last_login = Column(String)  # Will store ISO format datetime 
\ No newline at end of file
+    last_login = Column(DateTime(timezone=True))
+    timezone = Column(String, default=DEFAULT_TIMEZONE, server_default=DEFAULT_TIMEZONE)  # IANA name, used to display timestamps
+    locale = Column(String, default=DEFAULT_LOCALE, server_default=DEFAULT_LOCALE)  # BCP 47 tag, e.g. pt-BR
@@ -1,6 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
-from typing import List
+from typing import List, Optional
+
+from app.core.timezones import UTCDateTime
+
+# Messages accepted per POST /chat/messages/batch
+BATCH_MAX_MESSAGES = 50
+# Suffix of the client id under which a batch's AI reply is stored
+REPLY_ID_SUFFIX = ":reply"
 
 class ChatMessageBase(BaseModel):
     content: str
@@ -12,15 +19,37 @@ class ChatMessageCreate(ChatMessageBase):
 class ChatMessageResponse(ChatMessageBase):
     id: int
     is_user: bool
-    created_at: datetime
+    created_at: UTCDateTime
+    client_message_id: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class ChatBatchMessage(BaseModel):
+    client_message_id: str = Field(min_length=1, max_length=64)
+    content: str = Field(min_length=1)
+
+    @field_validator("client_message_id")
+    @classmethod
+    def validate_client_message_id(cls, v):
+        # Reserved for the stored AI reply of a batch, which shares the id namespace
+        if v.endswith(REPLY_ID_SUFFIX):
+            raise ValueError(f"client_message_id must not end with {REPLY_ID_SUFFIX!r}")
+        return v
+
+class ChatMessageBatchCreate(BaseModel):
+    messages: List[ChatBatchMessage] = Field(min_length=1, max_length=BATCH_MAX_MESSAGES)
+
+class ChatMessageBatchResponse(BaseModel):
+    session_id: int
+    messages: List[ChatMessageResponse]  # every message of the batch, in order, including ones stored by a previous try
+    duplicates: int  # messages skipped because they were already stored
+    reply: ChatMessageResponse
+
 class ChatSessionResponse(BaseModel):
     id: int
-    started_at: str
-    created_at: datetime
+    started_at: Optional[UTCDateTime] = None
+    created_at: UTCDateTime
     is_active: bool
 
     class Config:
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import List, Optional
 from datetime import datetime
 
@@ -12,6 +12,17 @@ class SessionSummaryBase(BaseModel):
     summary_text: str
     suggestions: List[str]
     progress_observations: List[str]
+
+    @field_validator("risk_level", mode="before")
+    @classmethod
+    def default_risk_level(cls, value):
+        # Older summaries were stored without a risk level
+        return "low" if value is None else value
+
+    @field_validator("key_topics", "suggestions", "progress_observations", mode="before")
+    @classmethod
+    def default_empty_list(cls, value):
+        return [] if value is None else value
     
 class SessionSummaryCreate(SessionSummaryBase):
     pass
@@ -21,4 +32,11 @@ class SessionSummaryResponse(SessionSummaryBase):
     created_at: datetime
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class SummaryJobStatus(BaseModel):
+    session_id: int
+    status: str  # pending, running, succeeded, failed
+    attempts: int = 0
+    last_error: Optional[str] = None
+    updated_at: Optional[datetime] = None
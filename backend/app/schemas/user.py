@@ -1,6 +1,12 @@
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, field_validator
 from datetime import datetime
 from typing import Optional
+import re
+
+from app.core.timezones import get_zone
+
+# Language tag with an optional region, e.g. "pt", "pt-BR", "es-419"
+LOCALE_PATTERN = re.compile(r"[a-z]{2,3}(-([A-Z]{2}|\d{3}))?")
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -14,6 +20,8 @@ class UserResponse(UserBase):
     is_active: bool
     created_at: datetime
     last_login: Optional[datetime] = None
+    timezone: Optional[str] = None
+    locale: Optional[str] = None
 
     model_config = ConfigDict(
         from_attributes=True,
@@ -22,7 +30,50 @@ class UserResponse(UserBase):
         }
     )
 
+class UserPreferences(BaseModel):
+    timezone: str
+    locale: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+class UserPreferencesUpdate(BaseModel):
+    timezone: Optional[str] = None
+    locale: Optional[str] = None
+
+    @field_validator("timezone")
+    @classmethod
+    def validate_timezone(cls, v):
+        if v is not None:
+            get_zone(v)
+        return v
+
+    @field_validator("locale")
+    @classmethod
+    def validate_locale(cls, v):
+        if v is not None and not LOCALE_PATTERN.fullmatch(v):
+            raise ValueError(f"Invalid locale: {v}")
+        return v
+
 class UserSessionsResponse(BaseModel):
     available_sessions: int
     used_sessions: int
-  
\ No newline at end of file
+
+class UserPrincipal(BaseModel):
+    """
+    Snapshot of the authenticated user, cached between requests.
+
+    The session quota fields may lag the database by up to the cache TTL;
+    read them from the users table wherever they are shown or enforced.
+    """
+    id: int
+    email: str
+    name: Optional[str] = None
+    is_active: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    last_login: Optional[datetime] = None
+    available_sessions: Optional[int] = None
+    used_sessions: Optional[int] = None
+    timezone: Optional[str] = None
+    locale: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
@@ -1,12 +1,12 @@
-import os
-from openai import OpenAI
 from typing import List, Dict, Any
 import json
 from datetime import datetime
+from app.core.config import settings
+from app.services.llm_providers import llm_provider
+from app.services.risk_detector import risk_detector
 
 class AIService:
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         self.system_prompt = """Você é um assistente psicológico virtual chamado Lumen. 
         Sua função é oferecer suporte emocional e orientação inicial, sempre deixando claro 
         que você é uma IA e não substitui um profissional de saúde mental.
@@ -19,7 +19,7 @@ class AIService:
         5. Use linguagem acessível e evite jargões técnicos
         6. Sempre termine a conversa com um lembrete sobre a importância de buscar ajuda profissional
         """
-        self.model = "gpt-4.5-preview"
+        self.model = settings.LLM_ANALYSIS_MODEL
 
     async def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """Analyze the sentiment of a text message"""
@@ -31,15 +31,15 @@ class AIService:
         
         Texto: {text}"""
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
+        content = await llm_provider.complete(
+            [
                 {"role": "system", "content": "Você é um analisador de sentimentos. Retorne apenas JSON."},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            model=self.model
         )
         
-        return json.loads(response.choices[0].message.content)
+        return json.loads(content)
 
     async def generate_response(self, message: str, history: List[Dict[str, str]]) -> Dict[str, Any]:
         """Generate a response to a user message"""
@@ -55,24 +55,18 @@ class AIService:
         # Add current message
         messages.append({"role": "user", "content": message})
         
-        response = self.client.chat.completions.create(
+        content = await llm_provider.complete(
+            messages,
             model=self.model,
-            messages=messages,
             temperature=0.7,
             max_tokens=500
         )
         
         return {
-            "content": response.choices[0].message.content,
+            "content": content,
             "timestamp": datetime.utcnow().isoformat()
         }
 
     def check_for_risk_factors(self, text: str) -> bool:
         """Check if the text contains risk factors that need immediate attention"""
-        risk_keywords = [
-            "suicídio", "matar", "morrer", "desesperado", "sem esperança",
-            "não aguento mais", "quero sumir", "acabar com tudo"
-        ]
-        
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in risk_keywords) 
\ No newline at end of file
+        return bool(risk_detector.scan(text).matches)
@@ -1,16 +1,13 @@
 from typing import List, Dict
 from app.models.chat import ChatMessage
 from app.services.metrics import calculate_session_metrics
-import openai
 from app.core.config import settings
+from app.services.llm_providers import llm_provider
 import json
 
-# Configure OpenAI
-openai.api_key = settings.OPENAI_API_KEY
-
-def generate_session_summary(messages: List[ChatMessage], metrics: Dict) -> Dict:
+async def generate_session_summary(messages: List[ChatMessage], metrics: Dict) -> Dict:
     """
-    Generate a comprehensive session summary using OpenAI's API.
+    Generate a comprehensive session summary with the configured summary model.
     Returns a dictionary with all summary fields.
     """
     # Format messages for the prompt
@@ -47,20 +44,20 @@ As sugestões devem ser práticas e acionáveis.
 As observações devem focar no progresso e desenvolvimento.
 """
 
-    # Call OpenAI API
-    response = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[
+    # Call the LLM provider
+    content = await llm_provider.complete(
+        [
             {"role": "system", "content": "Você é um assistente terapêutico especializado em gerar resumos estruturados de sessões. Retorne APENAS o JSON válido, sem nenhum texto adicional."},
             {"role": "user", "content": prompt}
         ],
+        model=settings.LLM_SUMMARY_MODEL,
         temperature=0.7,
         max_tokens=1000
     )
     
     try:
-        # Get the content and clean it
-        content = response.choices[0].message.content.strip()
+        # Clean the content
+        content = content.strip()
         
         # Remove any markdown code block markers if present
         if content.startswith('```json'):
@@ -1,12 +1,15 @@
-from typing import List
-import os
-import openai
+from typing import AsyncIterator, List, Optional
 from app.models.chat import ChatMessage
 from app.schemas.chat import ChatMessageCreate
+from app.core.config import settings
+from app.services.llm_providers import llm_provider
+from app.services.semantic_cache import semantic_cache
+
+FALLBACK_RESPONSE = "I apologize, but I'm having trouble processing your message right now. Could you please try again?"
 
 class ChatService:
     def __init__(self):
-        openai.api_key = os.getenv("OPENAI_API_KEY")
+        self.model = settings.LLM_CHAT_MODEL
         self.system_prompt = """You are a supportive and empathetic AI assistant focused on mental health and emotional well-being. 
         Your role is to:
         1. Listen actively and show understanding
@@ -22,20 +25,13 @@ class ChatService:
         - Avoid making diagnoses or giving medical advice
         - Suggest seeking professional help when appropriate"""
 
-    async def get_ai_response(self, user_message: ChatMessageCreate, context: List[ChatMessage] = None) -> str:
-        """
-        Get AI response for a user message using GPT-3.5.
-        
-        Args:
-            user_message: The user's message
-            context: Optional list of previous messages for context
-            
-        Returns:
-            str: AI's response
-        """
-        # Prepare conversation history
+    def _build_messages(self, user_message: ChatMessageCreate, context: List[ChatMessage] = None, digest: Optional[str] = None) -> List[dict]:
+        """Build the OpenAI message list from the system prompt, context and user message."""
         messages = [{"role": "system", "content": self.system_prompt}]
         
+        if digest:
+            messages.append({"role": "system", "content": f"Earlier in this conversation:\n{digest}"})
+        
         if context:
             for msg in reversed(context):  # Add messages in chronological order
                 role = "user" if msg.is_user else "assistant"
@@ -43,15 +39,92 @@ class ChatService:
         
         # Add current user message
         messages.append({"role": "user", "content": user_message.content})
+        return messages
+
+    def _cache_fingerprint(self, context: List[ChatMessage] = None, digest: Optional[str] = None) -> str:
+        """Fingerprint everything besides the user message that shapes the reply."""
+        turns = [f"{'user' if msg.is_user else 'assistant'}:{msg.content}" for msg in reversed(context or [])]
+        return semantic_cache.fingerprint(self.model, self.system_prompt, digest, *turns)
+
+    async def get_ai_response(self, user_message: ChatMessageCreate, context: List[ChatMessage] = None, digest: Optional[str] = None) -> str:
+        """
+        Get AI response for a user message from the configured chat model.
+        
+        Args:
+            user_message: The user's message
+            context: Optional list of previous messages for context, most recent first
+            digest: Optional summary of older turns that did not fit the context
+            
+        Returns:
+            str: AI's response
+        """
+        cacheable = semantic_cache.accepts(user_message.content, len(context or []))
+        if cacheable:
+            fingerprint = self._cache_fingerprint(context, digest)
+            cached = semantic_cache.lookup(user_message.content, fingerprint)
+            if cached is not None:
+                return cached
+
+        # Prepare conversation history
+        messages = self._build_messages(user_message, context, digest)
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
+            response = await llm_provider.complete(
+                messages,
+                model=self.model,
                 temperature=0.7,
                 max_tokens=500
             )
-            return response.choices[0].message.content
         except Exception as e:
             # Fallback response in case of API error
-            return "I apologize, but I'm having trouble processing your message right now. Could you please try again?" 
\ No newline at end of file
+            return FALLBACK_RESPONSE
+
+        if cacheable:
+            semantic_cache.store(user_message.content, fingerprint, response)
+        return response
+
+    async def stream_ai_response(self, user_message: ChatMessageCreate, context: List[ChatMessage] = None, digest: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Stream the AI response for a user message token by token.
+        
+        Args:
+            user_message: The user's message
+            context: Optional list of previous messages for context, most recent first
+            digest: Optional summary of older turns that did not fit the context
+            
+        Yields:
+            str: Content deltas as they arrive from the model
+        
+        If the API fails before any token is produced the fallback response is
+        yielded instead; failures after the first token are re-raised so the
+        caller can discard the partial response. A cached reply is yielded as
+        a single chunk, and only complete streams are stored in the cache.
+        """
+        cacheable = semantic_cache.accepts(user_message.content, len(context or []))
+        if cacheable:
+            fingerprint = self._cache_fingerprint(context, digest)
+            cached = semantic_cache.lookup(user_message.content, fingerprint)
+            if cached is not None:
+                yield cached
+                return
+
+        messages = self._build_messages(user_message, context, digest)
+        chunks = []
+        
+        try:
+            async for content in llm_provider.stream(
+                messages,
+                model=self.model,
+                temperature=0.7,
+                max_tokens=500
+            ):
+                chunks.append(content)
+                yield content
+        except Exception:
+            if chunks:
+                raise
+            yield FALLBACK_RESPONSE
+            return
+
+        if cacheable:
+            semantic_cache.store(user_message.content, fingerprint, "".join(chunks))
@@ -0,0 +1,114 @@
+import math
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.chat import ChatMessage
+
+# Approximate per-message overhead of the chat completions format
+MESSAGE_TOKEN_OVERHEAD = 4
+DIGEST_LINE_CHARS = 160
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for budgeting."""
+    return math.ceil(len(text or "") / 4) + MESSAGE_TOKEN_OVERHEAD
+
+
+class ConversationContext(NamedTuple):
+    turns: List[ChatMessage]  # Most recent first, as returned by the query
+    digest: Optional[str]  # Summary of turns that no longer fit the budget
+    tokens: int
+
+
+class _Digest(NamedTuple):
+    upto_id: int  # Id of the newest message folded into the digest
+    lines: Tuple[str, ...]
+
+
+class ConversationContextBuilder:
+    """
+    Assemble the prompt context for a chat turn within a token budget.
+
+    Recent turns are added newest first until the budget is used; turns
+    that fall out of the window are folded into a short running digest per
+    session. Token counts are the cheap `estimate_tokens` heuristic and are
+    recomputed on every call. Digests are kept in an in-process TTLCache per
+    session, so each message is folded at most once per worker; other
+    workers do not see them and rebuild their own digest from the history.
+    """
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        digest_token_budget: Optional[int] = None,
+    ):
+        self.token_budget = token_budget or settings.CHAT_CONTEXT_TOKEN_BUDGET
+        self.digest_token_budget = digest_token_budget or settings.CHAT_DIGEST_TOKEN_BUDGET
+        self._digests = TTLCache(maxsize=5000, ttl=3600)
+
+    def message_tokens(self, message: ChatMessage) -> int:
+        return estimate_tokens(message.content)
+
+    def build(self, session_id: int, recent: List[ChatMessage]) -> ConversationContext:
+        """
+        Select the turns to send for a session.
+
+        Args:
+            session_id: The chat session id
+            recent: Previous messages of the session, most recent first
+
+        Returns:
+            ConversationContext with the selected turns and the digest text
+        """
+        digest = self._digests.get(session_id)
+        turns_budget = self.token_budget - self.digest_token_budget
+
+        turns, used = self._select(recent, turns_budget if digest else self.token_budget)
+        if digest is None and len(turns) < len(recent):
+            # A digest is about to be started, so leave room for it
+            turns, used = self._select(recent, turns_budget)
+
+        overflow = recent[len(turns):]
+        if overflow:
+            digest = self._fold(session_id, digest, overflow)
+
+        digest_text = "\n".join(digest.lines) if digest else None
+        if digest_text:
+            used += estimate_tokens(digest_text)
+        return ConversationContext(turns=turns, digest=digest_text, tokens=used)
+
+    def _select(self, recent: List[ChatMessage], budget: int) -> Tuple[List[ChatMessage], int]:
+        turns = []
+        used = 0
+        for message in recent:
+            tokens = self.message_tokens(message)
+            if used + tokens > budget:
+                break
+            turns.append(message)
+            used += tokens
+        return turns, used
+
+    def _fold(self, session_id: int, digest: Optional[_Digest], overflow: List[ChatMessage]) -> Optional[_Digest]:
+        upto_id = digest.upto_id if digest else 0
+        new_messages = [msg for msg in reversed(overflow) if msg.id > upto_id]
+        if not new_messages:
+            return digest
+
+        lines = list(digest.lines) if digest else []
+        for msg in new_messages:
+            role = "Usuário" if msg.is_user else "Assistente"
+            first_sentence = re.split(r"(?<=[.!?])\s", (msg.content or "").strip(), maxsplit=1)[0]
+            lines.append(f"{role}: {first_sentence[:DIGEST_LINE_CHARS]}")
+
+        # Keep the most recently folded lines within the digest budget
+        while len(lines) > 1 and estimate_tokens("\n".join(lines)) > self.digest_token_budget:
+            lines.pop(0)
+
+        digest = _Digest(upto_id=new_messages[-1].id, lines=tuple(lines))
+        self._digests.set(session_id, digest)
+        return digest
+
+
+context_builder = ConversationContextBuilder()
@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Session, dict], Awaitable[None]]
+
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def register_job(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Register an async handler `handler(db, payload)` for a job kind.
+
+    Handlers run on the event loop, so they do their work with `db` through
+    run_in_threadpool and must not keep a transaction open across slow awaits.
+    """
+    def decorator(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = handler
+        return handler
+    return decorator
+
+
+def get_job(db: Session, kind: str, dedupe_key: str) -> Optional[Job]:
+    return db.query(Job).filter(Job.kind == kind, Job.dedupe_key == dedupe_key).first()
+
+
+def enqueue_job(db: Session, kind: str, dedupe_key: str, payload: dict, retry_failed: bool = False) -> Job:
+    """
+    Enqueue a job, or return the existing one for the same (kind, dedupe_key).
+
+    With `retry_failed`, a job that exhausted its attempts is reset to pending.
+    Commits the session.
+    """
+    job = get_job(db, kind, dedupe_key)
+    if job is None:
+        job = Job(
+            kind=kind,
+            dedupe_key=dedupe_key,
+            payload=payload,
+            status="pending",
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+            run_after=datetime.utcnow()
+        )
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Enqueued concurrently by another request
+            db.rollback()
+            job = get_job(db, kind, dedupe_key)
+    elif retry_failed and job.status == "failed":
+        job.status = "pending"
+        job.attempts = 0
+        job.run_after = datetime.utcnow()
+        db.commit()
+
+    job_worker.notify()
+    return job
+
+
+def _retry_delay(attempts: int) -> float:
+    delay = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_SECONDS)
+    return delay * random.uniform(1.0, 1.1)
+
+
+def _claim_next_job() -> Optional[Job]:
+    """Atomically move the next runnable job to `running` and return it."""
+    now = datetime.utcnow()
+    runnable = or_(
+        and_(Job.status == "pending", Job.run_after <= now),
+        # Jobs left running by a worker that died
+        and_(Job.status == "running", Job.locked_at < now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS))
+    )
+    db = SessionLocal()
+    try:
+        candidates = db.query(Job.id).filter(
+            runnable, Job.kind.in_(list(JOB_HANDLERS))
+        ).order_by(Job.run_after).limit(5).all()
+        for (job_id,) in candidates:
+            # Conditional update so only one worker wins the job
+            claimed = db.execute(
+                update(Job)
+                .where(Job.id == job_id, runnable)
+                .values(status="running", locked_at=now, attempts=Job.attempts + 1, updated_at=now)
+            ).rowcount
+            db.commit()
+            if claimed:
+                job = db.get(Job, job_id)
+                db.expunge(job)
+                return job
+        return None
+    finally:
+        db.close()
+
+
+def _finish_job(job_id: int, error: Optional[str] = None) -> None:
+    db = SessionLocal()
+    try:
+        job = db.get(Job, job_id)
+        if error is None:
+            job.status = "succeeded"
+            job.last_error = None
+        elif job.attempts >= job.max_attempts:
+            job.status = "failed"
+            job.last_error = error
+        else:
+            job.status = "pending"
+            job.last_error = error
+            job.run_after = datetime.utcnow() + timedelta(seconds=_retry_delay(job.attempts))
+        job.locked_at = None
+        db.commit()
+    finally:
+        db.close()
+
+
+async def run_job(job: Job) -> None:
+    handler = JOB_HANDLERS[job.kind]
+    db = SessionLocal()
+    try:
+        await handler(db, job.payload or {})
+    except Exception as e:
+        await run_in_threadpool(db.rollback)
+        logger.exception("Job %s (%s:%s) failed on attempt %s", job.id, job.kind, job.dedupe_key, job.attempts)
+        await run_in_threadpool(_finish_job, job.id, f"{type(e).__name__}: {e}")
+    else:
+        await run_in_threadpool(_finish_job, job.id)
+    finally:
+        await run_in_threadpool(db.close)
+
+
+class JobWorker:
+    """
+    Pool of asyncio tasks that poll the jobs table and run registered handlers.
+
+    Jobs are claimed with a conditional UPDATE, so several workers (and
+    several processes) can share the table without an external broker.
+    """
+
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self, concurrency: Optional[int] = None) -> None:
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        for _ in range(concurrency or settings.JOB_WORKER_CONCURRENCY):
+            self._tasks.append(asyncio.create_task(self._run()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+        self._loop = None
+
+    def notify(self) -> None:
+        """Wake idle workers after a job was enqueued in this process."""
+        if self._wakeup is not None:
+            # May be called from threadpool routes, so hop onto the worker loop
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                job = await run_in_threadpool(_claim_next_job)
+            except Exception:
+                logger.exception("Failed to claim job")
+                job = None
+
+            if job is not None:
+                await run_job(job)
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+
+job_worker = JobWorker()
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# How much of an unparseable upstream body to quote in LLMError messages
+ERROR_BODY_EXCERPT_CHARS = 200
+
+
+class LLMError(Exception):
+    """Raised when the LLM API returns an error or an unexpected payload."""
+
+
+class LLMClient:
+    """
+    Shared, non-blocking client for the OpenAI chat completions API.
+
+    A single pooled httpx.AsyncClient is reused by every service so TLS
+    connections stay warm, and a semaphore caps the number of in-flight
+    completions per worker. The HTTP client and semaphore are created lazily
+    inside the running event loop and released by `aclose()` on shutdown.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        max_connections: Optional[int] = None,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+    ):
+        self.api_key = api_key or settings.OPENAI_API_KEY
+        self.base_url = (base_url or settings.OPENAI_BASE_URL).rstrip("/")
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self.max_connections = max_connections or settings.LLM_MAX_CONNECTIONS
+        self.timeout = timeout or settings.LLM_TIMEOUT_SECONDS
+        self.connect_timeout = connect_timeout or settings.LLM_CONNECT_TIMEOUT_SECONDS
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _bind_loop(self) -> None:
+        # Pooled connections and the semaphore belong to one event loop; start
+        # fresh if we are now running on a different one
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        stale, self._client, self._semaphore, self._loop = self._client, None, None, loop
+        if stale is not None:
+            try:
+                # Release the old pool's sockets instead of leaving them to the GC
+                await stale.aclose()
+            except RuntimeError as e:
+                logger.debug("Could not close LLM client of a previous event loop: %s", e)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        **params: Any,
+    ) -> Dict[str, Any]:
+        """Create a chat completion and return the raw response payload."""
+        payload = {"model": model, "messages": messages, **params}
+        await self._bind_loop()
+        async with self._get_semaphore():
+            try:
+                response = await self._get_client().post("/chat/completions", json=payload)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                raise LLMError(f"Chat completion request failed: {e}") from e
+        try:
+            return response.json()
+        except ValueError as e:
+            raise LLMError(
+                f"Chat completion returned an invalid body "
+                f"(status {response.status_code}): {response.text[:ERROR_BODY_EXCERPT_CHARS]!r}"
+            ) from e
+
+    async def chat_completion_content(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        **params: Any,
+    ) -> str:
+        """Create a chat completion and return only the first choice's content."""
+        data = await self.chat_completion(messages, model, **params)
+        try:
+            return data["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError) as e:
+            raise LLMError(f"Unexpected chat completion payload: {str(data)[:ERROR_BODY_EXCERPT_CHARS]}") from e
+
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        **params: Any,
+    ) -> AsyncIterator[str]:
+        """Stream a chat completion, yielding content deltas as they arrive."""
+        payload = {"model": model, "messages": messages, "stream": True, **params}
+        await self._bind_loop()
+        async with self._get_semaphore():
+            try:
+                async with self._get_client().stream("POST", "/chat/completions", json=payload) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        try:
+                            choices = json.loads(data).get("choices") or [{}]
+                            content = choices[0].get("delta", {}).get("content")
+                        except (ValueError, KeyError, IndexError, AttributeError) as e:
+                            raise LLMError(
+                                f"Chat completion stream sent an invalid chunk "
+                                f"(status {response.status_code}): {data[:ERROR_BODY_EXCERPT_CHARS]!r}"
+                            ) from e
+                        if content:
+                            yield content
+            except httpx.HTTPError as e:
+                raise LLMError(f"Chat completion stream failed: {e}") from e
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+
+
+llm_client = LLMClient()
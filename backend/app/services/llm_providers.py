@@ -0,0 +1,271 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.observability import LLM_ERRORS, LLM_REQUEST_DURATION, LLM_TOKENS, span
+from app.services.context_builder import estimate_tokens
+from app.services.llm_client import LLMClient, LLMError, llm_client
+
+logger = logging.getLogger(__name__)
+
+Messages = List[Dict[str, str]]
+
+
+class LLMProvider(ABC):
+    """
+    Chat completion backend used by every service that talks to a model.
+
+    Implementations return the first choice's content from `complete` and
+    content deltas from `stream` (an async generator); both raise LLMError
+    on failure.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def complete(self, messages: Messages, model: str, **params: Any) -> str:
+        ...
+
+    @abstractmethod
+    def stream(self, messages: Messages, model: str, **params: Any) -> AsyncIterator[str]:
+        ...
+
+    async def aclose(self) -> None:
+        pass
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI-compatible chat completions API through the shared pooled LLMClient."""
+
+    name = "openai"
+
+    def __init__(self, client: Optional[LLMClient] = None):
+        self.client = client or llm_client
+
+    async def complete(self, messages: Messages, model: str, **params: Any) -> str:
+        return await self.client.chat_completion_content(messages, model=model, **params)
+
+    async def stream(self, messages: Messages, model: str, **params: Any) -> AsyncIterator[str]:
+        async for content in self.client.stream_chat_completion(messages, model=model, **params):
+            yield content
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+MOCK_REPLIES = (
+    "Entendo. Pode me contar um pouco mais sobre como isso tem afetado o seu dia a dia?",
+    "Obrigado por compartilhar isso comigo. O que você sente quando pensa nessa situação?",
+    "Parece que isso tem sido difícil para você. Como você costuma lidar com esses momentos?",
+    "Faz sentido se sentir assim. O que poderia te ajudar a se sentir um pouco melhor hoje?",
+    "Estou aqui para te ouvir. Quando foi a última vez que você se sentiu mais tranquilo?",
+)
+
+MOCK_JSON_REPLY = {
+    "summary_text": "Sessão simulada: o usuário compartilhou como está se sentindo e refletiu sobre a rotina.",
+    "key_topics": ["rotina", "emoções"],
+    "suggestions": ["Praticar respiração profunda", "Manter um diário de emoções"],
+    "progress_observations": ["Boa abertura para falar sobre os sentimentos"],
+    "sentiment": "neutral",
+    "confidence": 0.5,
+    "keywords": ["rotina"],
+    "risk_level": "low",
+}
+
+
+class MockProvider(LLMProvider):
+    """
+    Deterministic local backend for development and offline benchmarks.
+
+    The reply is picked from a fixed set by hashing the conversation, so the
+    same prompt always gets the same answer. Prompts whose system message
+    asks for JSON get a JSON object with the fields the summary and
+    sentiment prompts expect. `latency_ms` simulates time to first token and
+    `token_delay_ms` the gap between streamed words.
+    """
+
+    name = "mock"
+
+    def __init__(self, latency_ms: Optional[float] = None, token_delay_ms: Optional[float] = None):
+        self.latency_ms = settings.LLM_MOCK_LATENCY_MS if latency_ms is None else latency_ms
+        self.token_delay_ms = settings.LLM_MOCK_TOKEN_DELAY_MS if token_delay_ms is None else token_delay_ms
+
+    def _reply(self, messages: Messages) -> str:
+        if any(message["role"] == "system" and "JSON" in message["content"] for message in messages):
+            return json.dumps(MOCK_JSON_REPLY, ensure_ascii=False)
+        digest = hashlib.blake2b(json.dumps(messages, sort_keys=True).encode("utf-8"), digest_size=8)
+        return MOCK_REPLIES[int.from_bytes(digest.digest(), "big") % len(MOCK_REPLIES)]
+
+    async def complete(self, messages: Messages, model: str, **params: Any) -> str:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self._reply(messages)
+
+    async def stream(self, messages: Messages, model: str, **params: Any) -> AsyncIterator[str]:
+        await asyncio.sleep(self.latency_ms / 1000)
+        words = self._reply(messages).split(" ")
+        for i, word in enumerate(words):
+            if i and self.token_delay_ms:
+                await asyncio.sleep(self.token_delay_ms / 1000)
+            yield word if i == len(words) - 1 else word + " "
+
+
+class RecordReplayProvider(LLMProvider):
+    """
+    Cassette backend: records another provider's replies, or replays them offline.
+
+    Interactions are appended to a JSON Lines file keyed by a hash of the
+    model, messages and sampling params. In "record" mode every call goes to
+    the wrapped provider and is saved; in "replay" mode calls are answered
+    from the cassette and a missing interaction raises LLMError. With
+    `replay_latency` the recorded latency is reproduced, so benchmarks see
+    realistic timings without network access.
+    """
+
+    name = "cassette"
+    MODES = ("record", "replay")
+
+    def __init__(self, inner: LLMProvider, path: str, mode: str, replay_latency: Optional[bool] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.inner = inner
+        self.path = path
+        self.mode = mode
+        self.replay_latency = settings.LLM_CASSETTE_REPLAY_LATENCY if replay_latency is None else replay_latency
+        self._interactions: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            if self.mode == "replay":
+                raise FileNotFoundError(f"LLM cassette not found: {self.path}")
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    interaction = json.loads(line)
+                    self._interactions[interaction["key"]] = interaction
+        logger.info("Loaded %d LLM interactions from %s", len(self._interactions), self.path)
+
+    @staticmethod
+    def key(messages: Messages, model: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps({"model": model, "messages": messages, "params": params}, sort_keys=True)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _save(self, key: str, model: str, chunks: List[str], latency_ms: float) -> None:
+        interaction = {"key": key, "model": model, "chunks": chunks, "latency_ms": round(latency_ms, 1)}
+        with self._lock:
+            self._interactions[key] = interaction
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(interaction, ensure_ascii=False) + "\n")
+
+    async def _replay(self, key: str) -> List[str]:
+        interaction = self._interactions.get(key)
+        if interaction is None:
+            raise LLMError(f"No recorded LLM interaction for key {key} in {self.path}")
+        if self.replay_latency:
+            await asyncio.sleep(interaction["latency_ms"] / 1000)
+        return interaction["chunks"]
+
+    async def complete(self, messages: Messages, model: str, **params: Any) -> str:
+        key = self.key(messages, model, params)
+        if self.mode == "replay":
+            return "".join(await self._replay(key))
+        started = time.perf_counter()
+        content = await self.inner.complete(messages, model, **params)
+        self._save(key, model, [content], (time.perf_counter() - started) * 1000)
+        return content
+
+    async def stream(self, messages: Messages, model: str, **params: Any) -> AsyncIterator[str]:
+        key = self.key(messages, model, params)
+        if self.mode == "replay":
+            for chunk in await self._replay(key):
+                yield chunk
+            return
+        started = time.perf_counter()
+        chunks = []
+        async for chunk in self.inner.stream(messages, model, **params):
+            chunks.append(chunk)
+            yield chunk
+        # Only complete streams are recorded
+        self._save(key, model, chunks, (time.perf_counter() - started) * 1000)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class InstrumentedProvider(LLMProvider):
+    """
+    Record latency, errors and estimated tokens of another provider.
+
+    Calls are also added to the request's `llm` span so they show up in
+    the Server-Timing header. Tokens use the same ~4 chars/token estimate as
+    the context budget, since streamed replies carry no usage data.
+    """
+
+    def __init__(self, inner: LLMProvider):
+        self.inner = inner
+        self.name = inner.name
+
+    def _record(self, model: str, operation: str, seconds: float, messages: Messages, reply: Optional[str]) -> None:
+        LLM_REQUEST_DURATION.observe(seconds, provider=self.name, model=model, operation=operation)
+        if reply is None:
+            LLM_ERRORS.inc(provider=self.name, model=model, operation=operation)
+            return
+        prompt_tokens = sum(estimate_tokens(message["content"]) for message in messages)
+        LLM_TOKENS.inc(prompt_tokens, provider=self.name, model=model, kind="prompt")
+        LLM_TOKENS.inc(estimate_tokens(reply), provider=self.name, model=model, kind="completion")
+
+    async def complete(self, messages: Messages, model: str, **params: Any) -> str:
+        started = time.perf_counter()
+        reply = None
+        try:
+            with span("llm"):
+                reply = await self.inner.complete(messages, model, **params)
+            return reply
+        finally:
+            self._record(model, "complete", time.perf_counter() - started, messages, reply)
+
+    async def stream(self, messages: Messages, model: str, **params: Any) -> AsyncIterator[str]:
+        started = time.perf_counter()
+        chunks = []
+        completed = False
+        try:
+            with span("llm"):
+                async for chunk in self.inner.stream(messages, model, **params):
+                    chunks.append(chunk)
+                    yield chunk
+            completed = True
+        finally:
+            self._record(model, "stream", time.perf_counter() - started, messages, "".join(chunks) if completed else None)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+PROVIDERS = {
+    OpenAIProvider.name: OpenAIProvider,
+    MockProvider.name: MockProvider,
+}
+
+
+def create_llm_provider() -> LLMProvider:
+    """Build the provider selected by LLM_PROVIDER, wrapped in a cassette if LLM_CASSETTE_MODE is set, and instrumented."""
+    if settings.LLM_PROVIDER not in PROVIDERS:
+        raise RuntimeError(f"Unknown LLM_PROVIDER: {settings.LLM_PROVIDER}")
+    provider = PROVIDERS[settings.LLM_PROVIDER]()
+    if settings.LLM_CASSETTE_MODE:
+        if not settings.LLM_CASSETTE_PATH:
+            raise RuntimeError("LLM_CASSETTE_PATH must be set to use LLM_CASSETTE_MODE")
+        provider = RecordReplayProvider(provider, settings.LLM_CASSETTE_PATH, settings.LLM_CASSETTE_MODE)
+    return InstrumentedProvider(provider)
+
+
+llm_provider = create_llm_provider()
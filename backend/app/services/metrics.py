@@ -1,42 +1,30 @@
+from sqlalchemy import case, func, or_, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Update
+from typing import List, Optional, Sequence
 from app.models.chat import ChatSession, ChatMessage
-from datetime import datetime, timedelta, timezone
+from app.services.context_builder import MESSAGE_TOKEN_OVERHEAD, estimate_tokens
+from app.core.timezones import as_utc, utcnow
+
+SENTIMENT_COUNT_COLUMNS = {
+    "positive": ChatSession.positive_count,
+    "negative": ChatSession.negative_count,
+    "neutral": ChatSession.neutral_count,
+}
 
 def calculate_session_metrics(db: Session, session_id: int) -> dict:
     session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
     if not session:
         return None
     
-    messages = db.query(ChatMessage).filter(ChatMessage.session_id == session_id).all()
-    
-    # Create UTC-3 timezone
-    utc_minus_3 = timezone(timedelta(hours=-3))
-    
-    # Parse start_time and ensure it's in UTC-3
-    start_time = datetime.fromisoformat(session.started_at)
-    if start_time.tzinfo is None:
-        start_time = start_time.replace(tzinfo=utc_minus_3)
-    else:
-        start_time = start_time.astimezone(utc_minus_3)
-    
-    # Parse end_time and ensure it's in UTC-3
-    end_time = datetime.fromisoformat(session.ended_at) if session.ended_at else datetime.now()
-    if end_time.tzinfo is None:
-        end_time = end_time.replace(tzinfo=utc_minus_3)
-    else:
-        end_time = end_time.astimezone(utc_minus_3)
-        
+    start_time = as_utc(session.started_at or session.created_at)
+    end_time = as_utc(session.ended_at) or utcnow()
     duration_minutes = (end_time - start_time).total_seconds() / 60
     
-    # Count messages
-    message_count = len(messages)
-    
-    # Get sentiment distribution
-    sentiments = [msg.sentiment for msg in messages if msg.sentiment]
     sentiment_counts = {
-        "positive": sentiments.count("positive"),
-        "negative": sentiments.count("negative"),
-        "neutral": sentiments.count("neutral")
+        "positive": session.positive_count,
+        "negative": session.negative_count,
+        "neutral": session.neutral_count
     }
     
     # Determine overall sentiment
@@ -48,9 +36,78 @@ def calculate_session_metrics(db: Session, session_id: int) -> dict:
         overall_sentiment = "neutral"
     
     return {
-        "message_count": message_count,
+        "message_count": session.message_count,
         "duration_minutes": duration_minutes,
         "overall_sentiment": overall_sentiment,
         "risk_level": session.risk_level,
-        "sentiment_distribution": sentiment_counts
-    } 
\ No newline at end of file
+        "sentiment_distribution": sentiment_counts,
+        "token_count": session.token_count,
+        "first_message_at": session.first_message_at,
+        "last_message_at": session.last_message_at
+    }
+
+def session_aggregates_update(session_id: int, messages: Sequence[ChatMessage]) -> Update:
+    """
+    Build the UPDATE that adds freshly inserted messages to their session's aggregates.
+
+    The messages must already be flushed so their created_at is set. Counters
+    are incremented in SQL, so concurrent inserts into the same session do
+    not lose updates.
+    """
+    timestamps = [message.created_at for message in messages]
+    first_at, last_at = min(timestamps), max(timestamps)
+    values = {
+        ChatSession.message_count: ChatSession.message_count + len(messages),
+        ChatSession.token_count: ChatSession.token_count + sum(estimate_tokens(message.content) for message in messages),
+        ChatSession.first_message_at: case(
+            (or_(ChatSession.first_message_at.is_(None), ChatSession.first_message_at > first_at), first_at),
+            else_=ChatSession.first_message_at
+        ),
+        ChatSession.last_message_at: case(
+            (or_(ChatSession.last_message_at.is_(None), ChatSession.last_message_at < last_at), last_at),
+            else_=ChatSession.last_message_at
+        ),
+    }
+    for sentiment, column in SENTIMENT_COUNT_COLUMNS.items():
+        count = sum(1 for message in messages if message.sentiment == sentiment)
+        if count:
+            values[column] = column + count
+    return (
+        update(ChatSession)
+        .where(ChatSession.id == session_id)
+        .values(values)
+        .execution_options(synchronize_session=False)
+    )
+
+def session_aggregates_repair(session_ids: Optional[List[int]] = None) -> Update:
+    """
+    Build the UPDATE that recomputes the aggregates of sessions from their messages.
+
+    Used to backfill sessions created before the aggregates existed and to
+    repair drift; all sessions are recomputed when `session_ids` is None.
+    """
+    def aggregate(expression):
+        return (
+            select(expression)
+            .where(ChatMessage.session_id == ChatSession.id)
+            .correlate(ChatSession)
+            .scalar_subquery()
+        )
+
+    # Same estimate as estimate_tokens(), evaluated in SQL
+    tokens = (func.coalesce(func.length(ChatMessage.content), 0) + 3) // 4 + MESSAGE_TOKEN_OVERHEAD
+    values = {
+        ChatSession.message_count: aggregate(func.count(ChatMessage.id)),
+        ChatSession.token_count: func.coalesce(aggregate(func.sum(tokens)), 0),
+        ChatSession.first_message_at: aggregate(func.min(ChatMessage.created_at)),
+        ChatSession.last_message_at: aggregate(func.max(ChatMessage.created_at)),
+        # A repair is not an update of the session itself
+        ChatSession.updated_at: ChatSession.updated_at,
+    }
+    for sentiment, column in SENTIMENT_COUNT_COLUMNS.items():
+        values[column] = aggregate(func.count(ChatMessage.id).filter(ChatMessage.sentiment == sentiment))
+
+    statement = update(ChatSession).values(values).execution_options(synchronize_session=False)
+    if session_ids is not None:
+        statement = statement.where(ChatSession.id.in_(session_ids))
+    return statement
@@ -0,0 +1,128 @@
+import logging
+from typing import Optional
+
+import httpx
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import invalidate_principal
+from app.core.timezones import utcnow
+from app.models.payment import PaymentInbox
+from app.models.user import User
+from app.services.jobs import enqueue_job, register_job
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_JOB = "mercadopago_payment"
+
+# Webhook actions that may carry a status change worth fetching
+PAYMENT_ACTIONS = ("payment.created", "payment.updated")
+
+# Payment statuses that can still become "approved"
+PENDING_STATUSES = ("pending", "in_process", "authorized")
+
+
+class PaymentPending(Exception):
+    """The payment is still in flight; raised so the job is retried with backoff."""
+
+
+def record_payment_notification(db: Session, payment_id: str, notification: dict) -> None:
+    """
+    Store a webhook notification in the inbox and schedule its processing.
+
+    Repeated notifications for the same payment only bump the counter, and
+    the job is deduplicated by payment id. Commits the session.
+    """
+    bump = (
+        update(PaymentInbox)
+        .where(PaymentInbox.payment_id == payment_id)
+        .values(
+            notification_count=PaymentInbox.notification_count + 1,
+            last_notification=notification,
+            updated_at=utcnow()
+        )
+    )
+    if not db.execute(bump).rowcount:
+        db.add(PaymentInbox(payment_id=payment_id, last_notification=notification))
+    try:
+        db.commit()
+    except IntegrityError:
+        # First notification of this payment recorded concurrently by another request
+        db.rollback()
+        db.execute(bump)
+        db.commit()
+
+    # A job that gave up while the payment was pending runs again on a new notification
+    enqueue_job(db, PAYMENT_JOB, payment_id, {"payment_id": payment_id}, retry_failed=True)
+
+
+async def fetch_payment(payment_id: str) -> dict:
+    """Get the current state of a payment from the Mercado Pago API."""
+    async with httpx.AsyncClient(
+        base_url=settings.MERCADOPAGO_API_URL,
+        headers={"Authorization": f"Bearer {settings.MERCADOPAGO_ACCESS_TOKEN}"},
+        timeout=settings.MERCADOPAGO_TIMEOUT_SECONDS,
+    ) as client:
+        response = await client.get(f"/v1/payments/{payment_id}")
+        response.raise_for_status()
+        return response.json()
+
+
+def apply_payment(db: Session, payment_id: str, payment: dict) -> bool:
+    """
+    Record the fetched payment status and, if approved, credit the sessions.
+
+    Claiming the credit (setting credited_at where it is still NULL) and
+    incrementing users.available_sessions happen in one transaction, so
+    retries and concurrent workers credit a payment at most once. Returns
+    whether this call credited the user. Commits the session.
+    """
+    status = payment.get("status") or "unknown"
+    metadata = payment.get("metadata") or {}
+    user_id = metadata.get("user_id")
+    quantity = int(metadata.get("session_quantity") or 0)
+    if user_id and db.scalar(select(User.id).where(User.id == user_id)) is None:
+        # payment_inbox.user_id references users; keep the payment for manual review instead
+        logger.warning("Payment %s is for unknown user %s, recording it without a credit", payment_id, user_id)
+        user_id = None
+    values = {"status": status, "user_id": user_id, "session_quantity": quantity or None, "updated_at": utcnow()}
+
+    if status != "approved" or not user_id or not quantity:
+        # Refunds and chargebacks after the credit are recorded but not reversed here
+        db.execute(update(PaymentInbox).where(PaymentInbox.payment_id == payment_id).values(**values))
+        db.commit()
+        return False
+
+    claimed = db.execute(
+        update(PaymentInbox)
+        .where(PaymentInbox.payment_id == payment_id, PaymentInbox.credited_at.is_(None))
+        .values(credited_at=utcnow(), **values)
+    ).rowcount
+    email: Optional[str] = None
+    if claimed:
+        email = db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(available_sessions=User.available_sessions + quantity)
+            .returning(User.email)
+        ).scalar()
+    db.commit()
+
+    if email is not None:
+        # Core UPDATE bypasses the ORM events that normally drop the cached principal
+        invalidate_principal(email)
+    return bool(claimed)
+
+
+@register_job(PAYMENT_JOB)
+async def run_payment_job(db: Session, payload: dict) -> None:
+    payment_id = payload["payment_id"]
+    payment = await fetch_payment(payment_id)
+    credited = await run_in_threadpool(apply_payment, db, payment_id, payment)
+    if credited:
+        logger.info("Payment %s credited", payment_id)
+    elif payment.get("status") in PENDING_STATUSES:
+        raise PaymentPending(f"Payment {payment_id} is {payment['status']}")
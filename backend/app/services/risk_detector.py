@@ -0,0 +1,229 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEXICON_PATH = Path(__file__).resolve().parent.parent / "data" / "risk_lexicon.json"
+
+# Ordered from least to most severe
+RISK_LEVELS = ("low", "medium", "high")
+
+# Distinct message words whose stem lookup is remembered per compiled lexicon
+TOKEN_CACHE_SIZE = 50_000
+
+_WORD_RE = re.compile(r"\w+")
+_COMBINING_MARKS_RE = re.compile("[\u0300-\u036f]")
+
+
+def normalize_text(text: str) -> List[str]:
+    """Casefold, strip accents and split into words ("Não aguento" -> ["nao", "aguento"])."""
+    text = (text or "").casefold()
+    if not text.isascii():
+        text = _COMBINING_MARKS_RE.sub("", unicodedata.normalize("NFKD", text))
+    return _WORD_RE.findall(text)
+
+
+def _phrase_words(phrase: str) -> List[str]:
+    """Normalize a lexicon phrase, keeping a trailing "*" on stem words ("suicíd*" -> ["suicid*"])."""
+    words = []
+    for raw in phrase.split():
+        normalized = normalize_text(raw)
+        if normalized and raw.endswith("*"):
+            normalized[-1] += "*"
+        words.extend(normalized)
+    return words
+
+
+def max_risk_level(*levels: Optional[str]) -> Optional[str]:
+    """Return the most severe of the given levels, ignoring None and unknown values."""
+    ranked = [RISK_LEVELS.index(level) for level in levels if level in RISK_LEVELS]
+    return RISK_LEVELS[max(ranked)] if ranked else None
+
+
+class RiskAssessment(NamedTuple):
+    score: int  # Sum of the weights of the distinct phrases found, ignoring those inside a longer match
+    level: str
+    matches: Tuple[str, ...]
+
+
+class _Automaton:
+    """
+    Aho-Corasick automaton over normalized words.
+
+    Phrases are sequences of whole words, so word boundaries come for free
+    and a message is scanned with one dict lookup per word regardless of
+    the lexicon size. A phrase word ending in "*" is a stem: every word
+    starting with it, in messages and in other phrases alike, is read as
+    that stem, so "suicid*" covers "suicídio", "suicídios" and "suicidar".
+    """
+
+    def __init__(self, phrases: Dict[Tuple[str, ...], Tuple[str, int]]):
+        self._stems: Dict[int, set] = {}
+        for words in phrases:
+            for word in words:
+                if word.endswith("*"):
+                    self._stems.setdefault(len(word) - 1, set()).add(word[:-1])
+        self._stem_lengths = sorted(self._stems, reverse=True)
+        # word -> token for words already seen; bounded since messages are free text
+        self._tokens: Dict[str, str] = {}
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Outputs of a node as (phrase, weight, length in words), longest first
+        self._out: List[List[Tuple[str, int, int]]] = [[]]
+
+        compiled = {}
+        for words, (phrase, weight) in phrases.items():
+            key = tuple(self._token(word) for word in words)
+            # Phrases that differ only by words under the same stem keep the highest weight
+            if key not in compiled or weight > compiled[key][1]:
+                compiled[key] = (phrase, weight)
+
+        for words, (phrase, weight) in compiled.items():
+            node = 0
+            for word in words:
+                nxt = self._goto[node].get(word)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][word] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append((phrase, weight, len(words)))
+
+        # Breadth-first pass to link every node to its longest proper suffix
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for word, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(word, 0)
+                self._fail[child] = target
+                self._out[child].extend(self._out[self._fail[child]])
+
+    def _token(self, word: str) -> str:
+        """Map a word to the longest stem it starts with, as "stem*", or to itself."""
+        if word.endswith("*"):
+            word = word[:-1]
+        for length in self._stem_lengths:
+            if len(word) >= length and word[:length] in self._stems[length]:
+                return word[:length] + "*"
+        return word
+
+    def find(self, words: List[str]) -> List[Tuple[str, int]]:
+        """Return (phrase, weight) of the matches, leaving out any match inside a longer one."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: List[Tuple[int, str, int]] = []
+        node = 0
+        tokens = self._tokens if self._stems else None
+        for i, word in enumerate(words):
+            if tokens is not None:
+                token = tokens.get(word)
+                if token is None:
+                    token = self._token(word)
+                    if len(tokens) < TOKEN_CACHE_SIZE:
+                        tokens[word] = token
+                word = token
+            while node and word not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(word, 0)
+            if out[node]:
+                # Only the longest phrase ending here counts ("quero me matar" is
+                # "me matar", not also "matar"), and it swallows earlier matches
+                # that start inside it
+                phrase, weight, length = out[node][0]
+                start = i + 1 - length
+                while found and found[-1][0] >= start:
+                    found.pop()
+                found.append((start, phrase, weight))
+        return [(phrase, weight) for _, phrase, weight in found]
+
+
+class RiskDetector:
+    """
+    Flag risk phrases in chat messages using a weighted lexicon.
+
+    The lexicon is a JSON file with severity weights per phrase (words may
+    be "stem*" entries to cover inflections) and score thresholds per level.
+    It is compiled into a word-level Aho-Corasick automaton and recompiled
+    when the file changes on disk, so phrases can be tuned without a
+    restart. Overlapping phrases are scored once, by the longest match.
+    """
+
+    def __init__(self, lexicon_path: Optional[str] = None, reload_interval: Optional[float] = None):
+        self.lexicon_path = Path(lexicon_path or settings.RISK_LEXICON_PATH or DEFAULT_LEXICON_PATH)
+        self.reload_interval = settings.RISK_LEXICON_RELOAD_SECONDS if reload_interval is None else reload_interval
+        self._automaton: Optional[_Automaton] = None
+        self._thresholds: Dict[str, int] = {}
+        self._mtime: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Compile the lexicon file, keeping the previous automaton if it is invalid."""
+        with self._lock:
+            try:
+                mtime = os.stat(self.lexicon_path).st_mtime_ns
+                with open(self.lexicon_path, encoding="utf-8") as f:
+                    lexicon = json.load(f)
+
+                phrases = {}
+                for term in lexicon["terms"]:
+                    words = tuple(_phrase_words(term["phrase"]))
+                    if words:
+                        phrases[words] = (" ".join(words), int(term["weight"]))
+                thresholds = {level: int(lexicon["levels"][level]) for level in RISK_LEVELS[1:]}
+                automaton = _Automaton(phrases)
+            except (OSError, ValueError, KeyError, TypeError):
+                if self._automaton is None:
+                    raise
+                logger.exception("Failed to reload risk lexicon %s, keeping the previous one", self.lexicon_path)
+                return
+            finally:
+                self._checked_at = time.monotonic()
+
+            self._automaton = automaton
+            self._thresholds = thresholds
+            self._mtime = mtime
+            logger.info("Loaded %s risk phrases from %s", len(phrases), self.lexicon_path)
+
+    def _maybe_reload(self) -> None:
+        if self._automaton is None:
+            self.load()
+            return
+        if time.monotonic() - self._checked_at < self.reload_interval:
+            return
+        try:
+            changed = os.stat(self.lexicon_path).st_mtime_ns != self._mtime
+        except OSError:
+            changed = False
+        self._checked_at = time.monotonic()
+        if changed:
+            self.load()
+
+    def scan(self, text: str) -> RiskAssessment:
+        """Return the risk score, level and matched phrases for a message."""
+        self._maybe_reload()
+        weights = dict(self._automaton.find(normalize_text(text)))
+        score = sum(weights.values())
+
+        level = RISK_LEVELS[0]
+        for candidate in RISK_LEVELS[1:]:
+            if score >= self._thresholds[candidate]:
+                level = candidate
+        return RiskAssessment(score=score, level=level, matches=tuple(weights))
+
+
+risk_detector = RiskDetector()
@@ -0,0 +1,181 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from scipy.sparse import csr_matrix, vstack
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from app.core.config import settings
+from app.services.risk_detector import normalize_text, risk_detector
+
+# Normalized words that flip the meaning of a message ("nao consigo dormir"
+# vs "consigo dormir") while barely changing its character n-grams
+NEGATION_WORDS = frozenset({
+    "n", "nao", "nem", "nunca", "jamais", "sem", "nada", "nenhum", "nenhuma", "ninguem", "tampouco",
+})
+
+
+def _polarity(words: List[str]) -> Tuple[str, ...]:
+    return tuple(sorted(word for word in words if word in NEGATION_WORDS))
+
+
+class _Entry(NamedTuple):
+    vector: csr_matrix  # 1 x n_features, L2-normalized
+    polarity: Tuple[str, ...]  # Negation words of the message, sorted
+    response: str
+    expires_at: float
+
+
+class SemanticResponseCache:
+    """
+    Reuse AI replies for user messages that are near-duplicates of earlier ones.
+
+    Messages are compared by cosine similarity of hashed character n-gram
+    vectors, which need no fitting and tolerate small variations in
+    spelling, accents and punctuation. Entries are grouped by a fingerprint of
+    the prompt context, so a reply is only reused under the same system
+    prompt, model and previous turns. A similar message only matches when
+    it has the same negation words, since "não consigo dormir" and "consigo
+    dormir" are close in n-gram space. Entries expire after `ttl` seconds
+    and the least recently used are evicted beyond `maxsize`.
+
+    Messages flagged by the risk detector are never looked up or stored.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        threshold: Optional[float] = None,
+        ttl: Optional[float] = None,
+        maxsize: Optional[int] = None,
+        max_turns: Optional[int] = None,
+    ):
+        self.enabled = settings.SEMANTIC_CACHE_ENABLED if enabled is None else enabled
+        self.threshold = threshold or settings.SEMANTIC_CACHE_THRESHOLD
+        self.ttl = ttl or settings.SEMANTIC_CACHE_TTL_SECONDS
+        self.maxsize = maxsize or settings.SEMANTIC_CACHE_MAX_SIZE
+        self.max_turns = settings.SEMANTIC_CACHE_MAX_TURNS if max_turns is None else max_turns
+        self._vectorizer = HashingVectorizer(
+            analyzer="char_wb",
+            ngram_range=(2, 4),
+            n_features=2 ** 18,
+            alternate_sign=False,
+            norm="l2",
+        )
+        # (fingerprint, normalized text) -> entry, in LRU order
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        # fingerprint -> (keys, stacked vectors), rebuilt when the group changes
+        self._matrices: Dict[str, Tuple[List[Tuple[str, str]], csr_matrix]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.skipped_risk = 0
+
+    @staticmethod
+    def fingerprint(*parts: Optional[str]) -> str:
+        """Stable key for the prompt context (model, system prompt, digest, previous turns...)."""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update((part or "").encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def accepts(self, text: str, turns: int) -> bool:
+        """Whether a message with `turns` previous turns may be served from / stored in the cache."""
+        if not self.enabled or turns > self.max_turns:
+            return False
+        if risk_detector.scan(text).matches:
+            self.skipped_risk += 1
+            return False
+        return True
+
+    def lookup(self, text: str, fingerprint: str) -> Optional[str]:
+        words = normalize_text(text)
+        normalized = " ".join(words)
+        key = (fingerprint, normalized)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at >= now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.response
+
+            match = self._most_similar(fingerprint, self._vectorizer.transform([normalized]), _polarity(words), now)
+            if match is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(match)
+            self.hits += 1
+            self.similar_hits += 1
+            return self._entries[match].response
+
+    def store(self, text: str, fingerprint: str, response: str) -> None:
+        words = normalize_text(text)
+        normalized = " ".join(words)
+        if not normalized or not response:
+            return
+        key = (fingerprint, normalized)
+        entry = _Entry(
+            self._vectorizer.transform([normalized]), _polarity(words), response, time.monotonic() + self.ttl
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._matrices.pop(fingerprint, None)
+            while len(self._entries) > self.maxsize:
+                (evicted_fingerprint, _), _ = self._entries.popitem(last=False)
+                self._matrices.pop(evicted_fingerprint, None)
+
+    def _most_similar(
+        self, fingerprint: str, vector: csr_matrix, polarity: Tuple[str, ...], now: float
+    ) -> Optional[Tuple[str, str]]:
+        keys, matrix = self._matrix(fingerprint)
+        if not keys:
+            return None
+        scores = (matrix @ vector.T).toarray().ravel()
+        # Best candidates first, skipping expired entries and opposite polarity
+        for index in scores.argsort()[::-1]:
+            if scores[index] < self.threshold:
+                return None
+            entry = self._entries[keys[index]]
+            if entry.expires_at >= now and entry.polarity == polarity:
+                return keys[index]
+        return None
+
+    def _matrix(self, fingerprint: str) -> Tuple[List[Tuple[str, str]], Optional[csr_matrix]]:
+        cached = self._matrices.get(fingerprint)
+        if cached is None:
+            keys = [key for key in self._entries if key[0] == fingerprint]
+            matrix = vstack([self._entries[key].vector for key in keys]).tocsr() if keys else None
+            cached = self._matrices[fingerprint] = (keys, matrix)
+        return cached
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "skipped_risk": self.skipped_risk,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+semantic_cache = SemanticResponseCache()
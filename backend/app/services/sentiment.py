@@ -0,0 +1,72 @@
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED_PATH = Path(__file__).resolve().parent.parent / "data" / "sentiment_seed.json"
+
+SENTIMENTS = ("positive", "negative", "neutral")
+
+
+class SentimentClassifier:
+    """
+    In-process positive/negative/neutral classifier for chat messages.
+
+    A TF-IDF (character n-grams, accent-insensitive) + logistic regression
+    pipeline is trained on the bundled seed corpus when the app starts, so
+    scoring a message is a local sparse dot product instead of an LLM call.
+    """
+
+    def __init__(self, seed_path: Optional[str] = None):
+        self.seed_path = Path(seed_path or settings.SENTIMENT_SEED_PATH or DEFAULT_SEED_PATH)
+        self._pipeline: Optional[Pipeline] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Train the pipeline on the seed corpus. Safe to call more than once."""
+        with self._lock:
+            if self._pipeline is not None:
+                return
+            with open(self.seed_path, encoding="utf-8") as f:
+                seed = json.load(f)
+
+            texts, labels = [], []
+            for label in SENTIMENTS:
+                texts.extend(seed[label])
+                labels.extend([label] * len(seed[label]))
+
+            pipeline = Pipeline([
+                ("tfidf", TfidfVectorizer(
+                    analyzer="char_wb",
+                    ngram_range=(2, 4),
+                    strip_accents="unicode",
+                    sublinear_tf=True,
+                )),
+                ("clf", LogisticRegression(max_iter=1000, class_weight="balanced")),
+            ])
+            pipeline.fit(texts, labels)
+            self._pipeline = pipeline
+            logger.info("Trained sentiment classifier on %s seed messages", len(texts))
+
+    def classify_many(self, texts: Sequence[str]) -> List[str]:
+        """Label a batch of texts in a single vectorized pass."""
+        if not texts:
+            return []
+        if self._pipeline is None:
+            self.load()
+        return self._pipeline.predict([text or "" for text in texts]).tolist()
+
+    def classify(self, text: str) -> str:
+        return self.classify_many([text])[0]
+
+
+sentiment_classifier = SentimentClassifier()
@@ -1,25 +1,35 @@
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.models.chat import ChatSession, ChatMessage, SessionSummary
 from app.schemas.summary import SessionSummaryCreate
-from datetime import datetime, timezone, timedelta
-import json
+from app.core.response_cache import invalidate_summary
 from app.services.ai_summary import generate_session_summary
 from app.services.metrics import calculate_session_metrics
+from app.services.jobs import enqueue_job, get_job, register_job
 
-def create_session_summary(db: Session, session_id: int) -> SessionSummary:
-    # Get session and messages
-    session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
-    if not session:
-        return None
-    
-    messages = db.query(ChatMessage).filter(ChatMessage.session_id == session_id).all()
-    
-    # Calculate metrics
-    metrics = calculate_session_metrics(db, session_id)
-    
-    # Generate summary using AI
-    summary_data = generate_session_summary(messages, metrics)
-    
+SUMMARY_JOB = "session_summary"
+
+def _load_summary_inputs(db: Session, session_id: int) -> Optional[Tuple[ChatSession, List[ChatMessage], dict]]:
+    """
+    Load the session, its messages and metrics, detached from `db`.
+
+    Ends the read transaction, so no connection is held while the summary
+    is generated. Returns None if the session does not exist.
+    """
+    try:
+        session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
+        if not session:
+            return None
+        messages = db.query(ChatMessage).filter(ChatMessage.session_id == session_id).all()
+        metrics = calculate_session_metrics(db, session_id)
+        db.expunge_all()
+        return session, messages, metrics
+    finally:
+        db.rollback()
+
+def _save_session_summary(db: Session, session_id: int, metrics: dict, summary_data: dict) -> SessionSummary:
+    """Insert the generated summary. Commits the session."""
     # summary_data = {
     #     "key_topics": ["Tópico 1", "Tópico 2", "Tópico 3"],
     #     "suggestions": ["Sugestão 1", "Sugestão 2", "Sugestão 3"],
@@ -32,12 +42,12 @@ def create_session_summary(db: Session, session_id: int) -> SessionSummary:
         session_id=session_id,
         overall_sentiment=metrics['overall_sentiment'],
         risk_level=metrics['risk_level'] or 'low',
-        key_topics=json.dumps(summary_data.get('key_topics', [])),
+        key_topics=summary_data.get('key_topics', []),
         message_count=metrics['message_count'],
         duration_minutes=metrics['duration_minutes'],
         summary_text=summary_data.get('summary_text', ''),
-        suggestions=json.dumps(summary_data.get('suggestions', [])),
-        progress_observations=json.dumps(summary_data.get('progress_observations', []))
+        suggestions=summary_data.get('suggestions', []),
+        progress_observations=summary_data.get('progress_observations', [])
     )
     
     db.add(db_summary)
@@ -45,64 +55,45 @@ def create_session_summary(db: Session, session_id: int) -> SessionSummary:
     db.refresh(db_summary)
     return db_summary
 
-def get_session_summary(db: Session, session_id: int) -> SessionSummary:
-    return db.query(SessionSummary).filter(SessionSummary.session_id == session_id).first()
-
-def calculate_session_metrics(db: Session, session_id: int) -> dict:
-    session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
-    if not session:
+async def create_session_summary(db: Session, session_id: int) -> SessionSummary:
+    # Get session, messages and metrics in one short transaction
+    inputs = await run_in_threadpool(_load_summary_inputs, db, session_id)
+    if inputs is None:
         return None
+    session, messages, metrics = inputs
     
-    messages = db.query(ChatMessage).filter(ChatMessage.session_id == session_id).all()
-    
-    try:
-        # Create UTC-3 timezone
-        utc_minus_3 = timezone(timedelta(hours=-3))
-        
-        # Parse start_time and ensure it's in UTC-3
-        start_time = datetime.fromisoformat(session.started_at)
-        if start_time.tzinfo is None:
-            start_time = start_time.replace(tzinfo=utc_minus_3)
-        else:
-            start_time = start_time.astimezone(utc_minus_3)
-        
-        # Parse end_time and ensure it's in UTC-3
-        end_time = datetime.fromisoformat(session.ended_at) if session.ended_at else datetime.now()
-        if end_time.tzinfo is None:
-            end_time = end_time.replace(tzinfo=utc_minus_3)
-        else:
-            end_time = end_time.astimezone(utc_minus_3)
-        
-        # Calculate duration in minutes
-        duration_minutes = (end_time - start_time).total_seconds() / 60
-        
-    except Exception as e:
-        print(f"Error calculating duration: {str(e)}")
-        raise
-    
-    # Count messages
-    message_count = len(messages)
-    
-    # Get sentiment distribution
-    sentiments = [msg.sentiment for msg in messages if msg.sentiment]
-    sentiment_counts = {
-        "positive": sentiments.count("positive"),
-        "negative": sentiments.count("negative"),
-        "neutral": sentiments.count("neutral")
-    }
-    
-    # Determine overall sentiment
-    if sentiment_counts["positive"] > sentiment_counts["negative"]:
-        overall_sentiment = "positive"
-    elif sentiment_counts["negative"] > sentiment_counts["positive"]:
-        overall_sentiment = "negative"
-    else:
-        overall_sentiment = "neutral"
+    # Generate summary using AI, with no transaction open
+    summary_data = await generate_session_summary(messages, metrics)
     
+    db_summary = await run_in_threadpool(_save_session_summary, db, session_id, metrics, summary_data)
+    await invalidate_summary(session.user_id, session_id)
+    return db_summary
+
+def get_session_summary(db: Session, session_id: int) -> SessionSummary:
+    return db.query(SessionSummary).filter(SessionSummary.session_id == session_id).first()
+
+def enqueue_session_summary(db: Session, session_id: int, retry_failed: bool = False):
+    """Schedule summary generation for a session; idempotent per session_id."""
+    return enqueue_job(db, SUMMARY_JOB, str(session_id), {"session_id": session_id}, retry_failed=retry_failed)
+
+def get_summary_job_status(db: Session, session_id: int) -> dict:
+    job = get_job(db, SUMMARY_JOB, str(session_id))
+    if job is None:
+        # Summaries generated before the job queue existed
+        status = "succeeded" if get_session_summary(db, session_id) else "not_found"
+        return {"session_id": session_id, "status": status}
     return {
-        "message_count": message_count,
-        "duration_minutes": duration_minutes,
-        "overall_sentiment": overall_sentiment,
-        "risk_level": session.risk_level,
-        "sentiment_distribution": sentiment_counts
-    } 
\ No newline at end of file
+        "session_id": session_id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "last_error": job.last_error,
+        "updated_at": job.updated_at
+    }
+
+@register_job(SUMMARY_JOB)
+async def run_session_summary_job(db: Session, payload: dict) -> None:
+    session_id = payload["session_id"]
+    if await run_in_threadpool(get_session_summary, db, session_id):
+        return
+    if not await create_session_summary(db, session_id):
+        raise ValueError(f"Session {session_id} not found")
@@ -1,23 +1,22 @@
-from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.schemas.user import UserCreate
-from passlib.context import CryptContext
+from app.core.security import hash_password
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(User).filter(User.email == email).first()
-
-def create_user(db: Session, user: UserCreate):
-    hashed_password = pwd_context.hash(user.password)
+async def create_user(db: AsyncSession, user: UserCreate):
+    # Hashed on the bounded bcrypt pool, off the event loop
+    hashed_password = await hash_password(user.password)
     db_user = User(
         email=user.email,
         name=user.name,
-        hashed_password=hashed_password,
-        created_at=datetime.utcnow().isoformat()
+        hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user 
\ No newline at end of file
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
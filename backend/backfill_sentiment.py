@@ -0,0 +1,63 @@
+import argparse
+import time
+
+from sqlalchemy import update
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.chat import ChatMessage
+from app.services.metrics import session_aggregates_repair
+from app.services.sentiment import sentiment_classifier
+
+
+def backfill_sentiment(batch_size: int, reclassify: bool = False):
+    """
+    Classify stored user messages in batches, walking the table by id.
+
+    Each batch recomputes the sentiment counters of the sessions it touched
+    in the same transaction, so chat_sessions never lags the new labels.
+    """
+    sentiment_classifier.load()
+    db = SessionLocal()
+    processed = 0
+    last_id = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            query = db.query(ChatMessage.id, ChatMessage.session_id, ChatMessage.content).filter(
+                ChatMessage.is_user == True,
+                ChatMessage.id > last_id
+            )
+            if not reclassify:
+                query = query.filter(ChatMessage.sentiment.is_(None))
+            rows = query.order_by(ChatMessage.id).limit(batch_size).all()
+            if not rows:
+                break
+
+            labels = sentiment_classifier.classify_many([content for _, _, content in rows])
+            db.execute(
+                update(ChatMessage),
+                [{"id": message_id, "sentiment": label} for (message_id, _, _), label in zip(rows, labels)]
+            )
+            session_ids = sorted({session_id for _, session_id, _ in rows if session_id is not None})
+            if session_ids:
+                db.execute(session_aggregates_repair(session_ids))
+            db.commit()
+
+            processed += len(rows)
+            last_id = rows[-1][0]
+            elapsed = time.perf_counter() - started
+            print(f"{processed} messages classified ({processed / elapsed:.0f} msgs/s)")
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    rate = processed / elapsed if elapsed else 0.0
+    print(f"Done: {processed} messages in {elapsed:.1f}s ({rate:.0f} msgs/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill chat_messages.sentiment for existing user messages.")
+    parser.add_argument("--batch-size", type=int, default=settings.SENTIMENT_BATCH_SIZE)
+    parser.add_argument("--all", action="store_true", help="Reclassify messages that already have a sentiment")
+    args = parser.parse_args()
+    backfill_sentiment(args.batch_size, reclassify=args.all)
@@ -0,0 +1,266 @@
+"""
+Benchmark the API hot paths in-process against SQLite with the mock LLM provider.
+
+Boots app.main:app behind an ASGI transport (no network), seeds users,
+sessions and messages, then fires a fixed number of requests per endpoint
+with bounded concurrency. Reports p50/p95/p99 latency, throughput and
+database queries per request (the http_request_db_queries count, read
+from the Server-Timing header) as JSON; pass --compare with an earlier
+result to flag p95 regressions.
+
+Usage: python -m benchmarks.api_hot_paths [--users 20 --requests 200 --output run.json]
+History with thousands of sessions:
+    python -m benchmarks.api_hot_paths --endpoints chat_history --users 10 --sessions 500 --messages 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "lumen_api_benchmark.db")
+# The app creates its tables on import, so start from a fresh file first
+if os.path.exists(DB_PATH):
+    os.remove(DB_PATH)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("MERCADOPAGO_ACCESS_TOKEN", "benchmark")
+os.environ.setdefault("LLM_PROVIDER", "mock")
+os.environ.setdefault("JOB_WORKERS_ENABLED", "false")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.database import SessionLocal  # noqa: E402
+from app.core.security import create_access_token, get_password_hash  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.chat import ChatMessage, ChatSession, SessionSummary  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.llm_providers import llm_provider  # noqa: E402
+from app.services.metrics import session_aggregates_repair  # noqa: E402
+
+PASSWORD = "benchmark-password"
+# Server-Timing entry written by TimingMiddleware, e.g. db;dur=3.1;desc="4x"
+DB_TIMING = re.compile(r'(?:^|,\s*)db;dur=[\d.]+;desc="(\d+)x"')
+ENDPOINTS = ("auth_token", "chat_message", "chat_history", "session_messages", "summary", "summary_metrics")
+
+
+def seed(users: int, sessions_per_user: int, messages_per_session: int) -> list:
+    """Insert the fixture data; returns one dict per user with its token and session ids."""
+    hashed_password = get_password_hash(PASSWORD)
+    started = datetime.now(timezone.utc) - timedelta(days=30)
+    db = SessionLocal()
+    try:
+        fixtures = []
+        for u in range(users):
+            user = User(
+                email=f"bench{u}@lumen.local",
+                name=f"Bench {u}",
+                hashed_password=hashed_password,
+                available_sessions=sessions_per_user + 1,
+                used_sessions=sessions_per_user,
+            )
+            db.add(user)
+            db.flush()
+            ended_ids = []
+            for s in range(sessions_per_user):
+                session_start = started + timedelta(days=s, minutes=u)
+                chat_session = ChatSession(
+                    user_id=user.id,
+                    is_active=False,
+                    started_at=session_start,
+                    ended_at=session_start + timedelta(minutes=50),
+                    risk_level="low",
+                )
+                db.add(chat_session)
+                db.flush()
+                db.execute(insert(ChatMessage), [
+                    {
+                        "session_id": chat_session.id,
+                        "content": f"Mensagem {m} da sessão {s}: hoje foi um dia comum, conversei sobre a rotina.",
+                        "is_user": m % 2 == 0,
+                        "sentiment": "neutral" if m % 2 == 0 else None,
+                        "timestamp": session_start + timedelta(seconds=30 * m),
+                        "created_at": (session_start + timedelta(seconds=30 * m)).replace(tzinfo=None),
+                    }
+                    for m in range(messages_per_session)
+                ])
+                db.add(SessionSummary(
+                    session_id=chat_session.id,
+                    overall_sentiment="neutral",
+                    risk_level="low",
+                    key_topics=["rotina", "trabalho"],
+                    suggestions=["Manter um diário de emoções"],
+                    progress_observations=["Relato estável"],
+                    message_count=messages_per_session,
+                    duration_minutes=50.0,
+                    summary_text="Sessão de benchmark.",
+                ))
+                ended_ids.append(chat_session.id)
+            # The active session receives the benchmarked chat messages
+            db.add(ChatSession(user_id=user.id, is_active=True, started_at=datetime.now(timezone.utc)))
+            fixtures.append({
+                "email": user.email,
+                "token": create_access_token({"sub": user.email}),
+                "session_ids": ended_ids,
+            })
+        db.commit()
+        db.execute(session_aggregates_repair())
+        db.commit()
+        return fixtures
+    finally:
+        db.close()
+
+
+def build_request(endpoint: str, fixture: dict, i: int) -> tuple:
+    """Return (method, url, kwargs) for the i-th request of an endpoint."""
+    headers = {"Authorization": f"Bearer {fixture['token']}"}
+    session_id = fixture["session_ids"][i % len(fixture["session_ids"])] if fixture["session_ids"] else 0
+    if endpoint == "auth_token":
+        return "POST", "/api/auth/token", {"data": {"username": fixture["email"], "password": PASSWORD}}
+    if endpoint == "chat_message":
+        return "POST", "/api/chat/message", {
+            "headers": headers,
+            "json": {"content": f"Hoje eu pensei bastante sobre o trabalho ({i})", "is_user": True},
+        }
+    if endpoint == "chat_history":
+        return "GET", "/api/chat/history?limit=20", {"headers": headers}
+    if endpoint == "session_messages":
+        return "GET", f"/api/chat/session/{session_id}/messages", {"headers": headers}
+    if endpoint == "summary":
+        return "GET", f"/api/summary/sessions/{session_id}/summary", {"headers": headers}
+    if endpoint == "summary_metrics":
+        return "GET", f"/api/summary/sessions/{session_id}/metrics", {"headers": headers}
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+def percentile(sorted_samples: list, q: float) -> float:
+    index = min(len(sorted_samples) - 1, max(0, round(q / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+async def run_endpoint(client: httpx.AsyncClient, endpoint: str, fixtures: list, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    db_queries = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        # Round-robin over users so concurrent writes rarely share a session
+        method, url, kwargs = build_request(endpoint, fixtures[i % len(fixtures)], i)
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+        match = DB_TIMING.search(response.headers.get("server-timing", ""))
+        db_queries.append(int(match.group(1)) if match else 0)
+        if response.status_code >= 400:
+            errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    samples = sorted(latencies)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1),
+        "mean_ms": round(statistics.fmean(samples), 2),
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "p99_ms": round(percentile(samples, 99), 2),
+        "max_ms": round(samples[-1], 2),
+        "db_queries_mean": round(statistics.fmean(db_queries), 2),
+        "db_queries_max": max(db_queries),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args) -> dict:
+    fixtures = seed(args.users, args.sessions, args.messages)
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            results = {}
+            for endpoint in args.endpoints:
+                # Warm caches and lazily created clients before measuring
+                await run_endpoint(client, endpoint, fixtures, min(args.concurrency, args.requests), args.concurrency)
+                results[endpoint] = await run_endpoint(client, endpoint, fixtures, args.requests, args.concurrency)
+    finally:
+        await app.router.shutdown()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "database": "sqlite",
+            "llm_provider": llm_provider.name,
+            "users": args.users,
+            "sessions_per_user": args.sessions,
+            "messages_per_session": args.messages,
+            "requests_per_endpoint": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Return a line per endpoint whose p95 grew more than `threshold` (fraction) over the baseline."""
+    regressions = []
+    for endpoint, result in current["results"].items():
+        before = baseline.get("results", {}).get(endpoint)
+        if not before or not before["p95_ms"]:
+            continue
+        change = result["p95_ms"] / before["p95_ms"] - 1
+        if change > threshold:
+            regressions.append(f"{endpoint}: p95 {before['p95_ms']} ms -> {result['p95_ms']} ms (+{change:.0%})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=5, help="Ended sessions per user")
+    parser.add_argument("--messages", type=int, default=40, help="Messages per ended session")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--output", help="Write the JSON result to this file instead of stdout")
+    parser.add_argument("--compare", help="Earlier JSON result to check for p95 regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p95 growth before failing (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
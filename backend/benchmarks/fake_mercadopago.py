@@ -0,0 +1,53 @@
+"""
+Local stand-in for the Mercado Pago payments API.
+
+Serves GET /v1/payments/{id} from an in-memory store so webhook handling
+can be exercised end to end without sandbox credentials. Payments are set
+through PUT /_fake/payments/{id}, and /_fake/webhook/{id} builds the
+notification body Mercado Pago would post. FAKE_MP_LATENCY_MS delays every
+API response.
+
+Usage:
+    uvicorn benchmarks.fake_mercadopago:app --port 8081
+    MERCADOPAGO_API_URL=http://127.0.0.1:8081 uvicorn app.main:app
+    curl -X PUT localhost:8081/_fake/payments/123 \\
+        -d '{"status": "approved", "metadata": {"user_id": 1, "session_quantity": 4}}'
+    curl localhost:8081/_fake/webhook/123 | curl -X POST localhost:8000/api/payment/webhook --json @-
+"""
+import asyncio
+import os
+from typing import Dict
+
+from fastapi import FastAPI, HTTPException
+
+LATENCY_MS = float(os.getenv("FAKE_MP_LATENCY_MS", "0"))
+
+app = FastAPI(title="Fake Mercado Pago")
+payments: Dict[str, dict] = {}
+requests_served: Dict[str, int] = {}
+
+
+@app.get("/v1/payments/{payment_id}")
+async def get_payment(payment_id: str):
+    await asyncio.sleep(LATENCY_MS / 1000)
+    requests_served[payment_id] = requests_served.get(payment_id, 0) + 1
+    if payment_id not in payments:
+        raise HTTPException(status_code=404, detail="Payment not found")
+    return payments[payment_id]
+
+
+@app.put("/_fake/payments/{payment_id}")
+async def set_payment(payment_id: str, data: dict):
+    payment = payments.setdefault(payment_id, {"id": int(payment_id) if payment_id.isdigit() else payment_id})
+    payment.update(data)
+    return payment
+
+
+@app.get("/_fake/webhook/{payment_id}")
+async def webhook_body(payment_id: str, action: str = "payment.updated"):
+    return {"type": "payment", "action": action, "data": {"id": payment_id}}
+
+
+@app.get("/_fake/stats")
+async def stats():
+    return {"payments": len(payments), "requests_served": requests_served}
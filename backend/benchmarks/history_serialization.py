@@ -0,0 +1,91 @@
+"""
+Measure chat history and session message serialization latency for large histories.
+
+Seeds a throwaway SQLite database with one user, a number of sessions and
+messages, then times GET /api/chat/history and /api/chat/session/{id}/messages.
+
+Usage: python -m benchmarks.history_serialization [--sessions 50 --messages 100]
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "lumen_history_benchmark.db")
+# The app creates its tables on import, so start from a fresh file first
+if os.path.exists(DB_PATH):
+    os.remove(DB_PATH)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("MERCADOPAGO_ACCESS_TOKEN", "benchmark")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.database import SessionLocal  # noqa: E402
+from app.core.security import create_access_token, get_password_hash  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.chat import ChatMessage, ChatSession  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+def seed(sessions: int, messages: int) -> tuple:
+    db = SessionLocal()
+    try:
+        user = User(email="bench@lumen.local", name="Bench", hashed_password=get_password_hash("bench"))
+        db.add(user)
+        db.flush()
+        session_ids = []
+        for _ in range(sessions):
+            chat_session = ChatSession(user_id=user.id, is_active=False)
+            db.add(chat_session)
+            db.flush()
+            db.add_all(
+                ChatMessage(
+                    session_id=chat_session.id,
+                    content=f"Mensagem {i} com algum texto para serializar",
+                    is_user=i % 2 == 0,
+                    sentiment="neutral"
+                ) for i in range(messages)
+            )
+            session_ids.append(chat_session.id)
+        db.commit()
+        return user.email, session_ids
+    finally:
+        db.close()
+
+
+def timed(client: TestClient, url: str, headers: dict, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url, headers=headers)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return {
+        "p50_ms": round(statistics.median(samples), 2),
+        "mean_ms": round(statistics.fmean(samples), 2),
+        "bytes": len(response.content),
+    }
+
+
+def run(sessions: int, messages: int, repeat: int) -> dict:
+    with TestClient(app) as client:
+        email, session_ids = seed(sessions, messages)
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+        return {
+            "sessions": sessions,
+            "messages_per_session": messages,
+            "history": timed(client, f"/api/chat/history?limit={min(sessions, 100)}", headers, repeat),
+            "session_messages": timed(client, f"/api/chat/session/{session_ids[0]}/messages", headers, repeat),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.sessions, args.messages, args.repeat), indent=2))
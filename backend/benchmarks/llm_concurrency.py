@@ -0,0 +1,93 @@
+"""
+Check that slow LLM replies overlap instead of queueing behind each other.
+
+Gives the mock provider a fixed latency, fires concurrent POST
+/api/chat/message requests and compares the wall time with what fully
+serialized and fully overlapped LLM calls would take. A probe keeps calling
+GET /health meanwhile; its latency shows whether waiting on the model
+blocks the event loop. Uses the same in-process setup as
+benchmarks.api_hot_paths.
+
+Usage: python -m benchmarks.llm_concurrency [--messages 64 --concurrency 32 --latency-ms 500]
+"""
+import argparse
+import asyncio
+import json
+import math
+import statistics
+import time
+
+import httpx
+
+from benchmarks.api_hot_paths import app, percentile, seed
+from benchmarks.login_burst import probe
+from app.services.llm_providers import MockProvider, llm_provider
+
+
+async def run(messages: int, concurrency: int, users: int, latency_ms: float) -> dict:
+    mock = getattr(llm_provider, "inner", llm_provider)
+    if not isinstance(mock, MockProvider):
+        raise SystemExit("LLM_PROVIDER must be mock for this benchmark")
+    mock.latency_ms = latency_ms
+
+    fixtures = seed(users, 1, 2)
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            semaphore = asyncio.Semaphore(concurrency)
+            message_latencies = []
+            failures = 0
+
+            async def send(i: int) -> None:
+                nonlocal failures
+                fixture = fixtures[i % len(fixtures)]
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.post(
+                        "/api/chat/message",
+                        headers={"Authorization": f"Bearer {fixture['token']}"},
+                        json={"content": f"Hoje eu pensei bastante sobre o trabalho ({i})", "is_user": True},
+                    )
+                    message_latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    failures += 1
+
+            stop = asyncio.Event()
+            probe_task = asyncio.create_task(probe(client, stop, 0.01))
+            started = time.perf_counter()
+            await asyncio.gather(*(send(i) for i in range(messages)))
+            elapsed = time.perf_counter() - started
+            stop.set()
+            probe_latencies = sorted(await probe_task)
+    finally:
+        await app.router.shutdown()
+
+    message_latencies.sort()
+    return {
+        "messages": messages,
+        "concurrency": concurrency,
+        "llm_latency_ms": latency_ms,
+        "failures": failures,
+        "elapsed_s": round(elapsed, 2),
+        # Lower bound if every LLM call overlaps, upper bound if they run one at a time
+        "overlapped_s": round(math.ceil(messages / concurrency) * latency_ms / 1000, 2),
+        "serialized_s": round(messages * latency_ms / 1000, 2),
+        "messages_per_second": round(messages / elapsed, 1),
+        "message_p50_ms": round(percentile(message_latencies, 50), 1),
+        "message_p99_ms": round(percentile(message_latencies, 99), 1),
+        "probe_requests": len(probe_latencies),
+        "probe_p50_ms": round(statistics.median(probe_latencies), 1),
+        "probe_p99_ms": round(percentile(probe_latencies, 99), 1),
+        "probe_max_ms": round(probe_latencies[-1], 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="Simulated LLM time to first token")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.messages, args.concurrency, args.users, args.latency_ms)), indent=2))
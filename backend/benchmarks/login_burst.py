@@ -0,0 +1,85 @@
+"""
+Measure login throughput and how much a login burst stalls other requests.
+
+Fires a burst of concurrent POST /api/auth/token requests while a probe
+keeps calling GET /health; the probe latency shows whether password
+hashing blocks the event loop. Uses the same in-process setup as
+benchmarks.api_hot_paths.
+
+Usage: python -m benchmarks.login_burst [--logins 64 --concurrency 32]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from benchmarks.api_hot_paths import PASSWORD, app, percentile, seed
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list:
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def run(logins: int, concurrency: int, users: int) -> dict:
+    fixtures = seed(users, 1, 2)
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            semaphore = asyncio.Semaphore(concurrency)
+            login_latencies = []
+            failures = 0
+
+            async def login(i: int) -> None:
+                nonlocal failures
+                fixture = fixtures[i % len(fixtures)]
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.post(
+                        "/api/auth/token", data={"username": fixture["email"], "password": PASSWORD}
+                    )
+                    login_latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    failures += 1
+
+            stop = asyncio.Event()
+            probe_task = asyncio.create_task(probe(client, stop, 0.01))
+            started = time.perf_counter()
+            await asyncio.gather(*(login(i) for i in range(logins)))
+            elapsed = time.perf_counter() - started
+            stop.set()
+            probe_latencies = sorted(await probe_task)
+    finally:
+        await app.router.shutdown()
+
+    login_latencies.sort()
+    return {
+        "logins": logins,
+        "concurrency": concurrency,
+        "failures": failures,
+        "logins_per_second": round(logins / elapsed, 1),
+        "login_p50_ms": round(percentile(login_latencies, 50), 1),
+        "login_p99_ms": round(percentile(login_latencies, 99), 1),
+        "probe_requests": len(probe_latencies),
+        "probe_p50_ms": round(statistics.median(probe_latencies), 1),
+        "probe_p99_ms": round(percentile(probe_latencies, 99), 1),
+        "probe_max_ms": round(probe_latencies[-1], 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=8)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.logins, args.concurrency, args.users)), indent=2))
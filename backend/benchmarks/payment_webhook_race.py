@@ -0,0 +1,182 @@
+"""
+Replay duplicate and concurrent Mercado Pago notifications and check each payment is credited once.
+
+Serves benchmarks.fake_mercadopago on a local port, points
+MERCADOPAGO_API_URL at it and runs the job workers in-process. Every
+payment gets `--notifications` webhook calls at once, plus a second burst
+after the job ran. Scenarios: an approved payment, one that is pending
+first and approved later, a rejected one, and an approved payment for a
+user that does not exist. Afterwards each user must have been credited
+exactly once (or not at all), and the inbox must count every
+notification. Uses the same in-process setup as benchmarks.api_hot_paths.
+
+Usage: python -m benchmarks.payment_webhook_race [--notifications 20]
+"""
+import os
+
+# Retry pending payments quickly instead of after minutes
+os.environ.setdefault("JOB_RETRY_BASE_SECONDS", "0.2")
+os.environ.setdefault("JOB_POLL_INTERVAL_SECONDS", "0.1")
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import json  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from benchmarks import fake_mercadopago  # noqa: E402
+from benchmarks.api_hot_paths import PASSWORD, app  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.database import SessionLocal  # noqa: E402
+from app.core.security import get_password_hash  # noqa: E402
+from app.models.job import Job  # noqa: E402
+from app.models.payment import PaymentInbox  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.jobs import job_worker  # noqa: E402
+from app.services.payments import PAYMENT_JOB  # noqa: E402
+
+QUANTITY = 3
+UNKNOWN_USER_ID = 10_000_000
+
+
+def seed() -> dict:
+    hashed_password = get_password_hash(PASSWORD)
+    db = SessionLocal()
+    try:
+        users = {
+            name: User(email=f"pay-{name}@lumen.local", name=name, hashed_password=hashed_password, available_sessions=0)
+            for name in ("approved", "pending", "rejected")
+        }
+        db.add_all(users.values())
+        db.commit()
+        return {name: user.id for name, user in users.items()}
+    finally:
+        db.close()
+
+
+async def start_fake_mercadopago() -> tuple:
+    server = uvicorn.Server(uvicorn.Config(fake_mercadopago.app, host="127.0.0.1", port=0, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, f"http://127.0.0.1:{port}"
+
+
+async def notify(client: httpx.AsyncClient, fake: httpx.AsyncClient, payment_id: str, times: int) -> list:
+    body = (await fake.get(f"/_fake/webhook/{payment_id}")).json()
+    responses = await asyncio.gather(*(client.post("/api/payment/webhook", json=body) for _ in range(times)))
+    return [response.status_code for response in responses]
+
+
+async def wait_for_jobs(payment_ids: list, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        db = SessionLocal()
+        try:
+            statuses = [
+                status for (status,) in db.query(Job.status).filter(
+                    Job.kind == PAYMENT_JOB, Job.dedupe_key.in_(payment_ids)
+                )
+            ]
+        finally:
+            db.close()
+        if len(statuses) == len(payment_ids) and all(status in ("succeeded", "failed") for status in statuses):
+            return
+        await asyncio.sleep(0.1)
+
+
+def check(user_ids: dict, payments: dict, notifications: int) -> list:
+    """Return a line per violated invariant."""
+    expected_sessions = {"approved": QUANTITY, "pending": QUANTITY, "rejected": 0}
+    problems = []
+    db = SessionLocal()
+    try:
+        for name, user_id in user_ids.items():
+            sessions = db.get(User, user_id).available_sessions
+            if sessions != expected_sessions[name]:
+                problems.append(f"{name}: available_sessions={sessions}, expected {expected_sessions[name]}")
+        for name, payment_id in payments.items():
+            inbox = db.query(PaymentInbox).filter(PaymentInbox.payment_id == payment_id).one_or_none()
+            job = db.query(Job).filter(Job.kind == PAYMENT_JOB, Job.dedupe_key == payment_id).one_or_none()
+            if inbox is None or job is None:
+                problems.append(f"{name}: inbox row or job missing")
+                continue
+            if inbox.notification_count != 2 * notifications:
+                problems.append(f"{name}: {inbox.notification_count} notifications recorded, sent {2 * notifications}")
+            if job.status != "succeeded":
+                problems.append(f"{name}: job {job.status} ({job.last_error})")
+            should_credit = name in ("approved", "pending")
+            if (inbox.credited_at is not None) != should_credit:
+                problems.append(f"{name}: credited_at={inbox.credited_at}")
+            if name == "unknown_user" and inbox.user_id is not None:
+                problems.append(f"unknown_user: user_id={inbox.user_id} recorded for a missing user")
+    finally:
+        db.close()
+    return problems
+
+
+async def run(notifications: int, workers: int) -> dict:
+    user_ids = seed()
+    server, server_task, fake_url = await start_fake_mercadopago()
+    settings.MERCADOPAGO_API_URL = fake_url
+    payments = {name: str(900_000 + i) for i, name in enumerate(("approved", "pending", "rejected", "unknown_user"))}
+    statuses = []
+
+    await app.router.startup()
+    job_worker.start(workers)
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client, \
+                httpx.AsyncClient(base_url=fake_url) as fake:
+
+            async def set_payment(name: str, status: str, user_id: int) -> None:
+                metadata = {"user_id": user_id, "session_quantity": QUANTITY}
+                await fake.put(f"/_fake/payments/{payments[name]}", json={"status": status, "metadata": metadata})
+
+            await set_payment("approved", "approved", user_ids["approved"])
+            await set_payment("pending", "pending", user_ids["pending"])
+            await set_payment("rejected", "rejected", user_ids["rejected"])
+            await set_payment("unknown_user", "approved", UNKNOWN_USER_ID)
+
+            # First burst: every payment at once
+            bursts = await asyncio.gather(*(notify(client, fake, payment_id, notifications) for payment_id in payments.values()))
+            statuses.extend(status for burst in bursts for status in burst)
+
+            # The pending payment is approved while its job is backing off
+            await asyncio.sleep(0.5)
+            await set_payment("pending", "approved", user_ids["pending"])
+
+            # Second burst: duplicates arriving after the credit
+            bursts = await asyncio.gather(*(notify(client, fake, payment_id, notifications) for payment_id in payments.values()))
+            statuses.extend(status for burst in bursts for status in burst)
+            await wait_for_jobs(list(payments.values()), timeout=30)
+            api_calls = (await fake.get("/_fake/stats")).json()["requests_served"]
+    finally:
+        await job_worker.stop()
+        await app.router.shutdown()
+        server.should_exit = True
+        await server_task
+
+    problems = check(user_ids, payments, notifications)
+    if set(statuses) != {200}:
+        problems.append(f"webhook statuses: {sorted(set(statuses))}")
+    return {
+        "notifications_per_payment": 2 * notifications,
+        "webhook_calls": len(statuses),
+        "payment_api_calls": api_calls,
+        "problems": problems,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--notifications", type=int, default=20, help="Concurrent notifications per payment and burst")
+    parser.add_argument("--workers", type=int, default=4, help="Job worker tasks")
+    args = parser.parse_args()
+    result = asyncio.run(run(args.notifications, args.workers))
+    print(json.dumps(result, indent=2))
+    sys.exit(1 if result["problems"] else 0)
@@ -0,0 +1,37 @@
+"""
+Measure sentiment classifier throughput (messages per second) per batch size.
+
+Usage: python -m benchmarks.sentiment_throughput [--messages 20000]
+"""
+import argparse
+import json
+import random
+import time
+
+from app.services.sentiment import SENTIMENTS, sentiment_classifier
+
+
+def run(messages: int, batch_sizes):
+    sentiment_classifier.load()
+    with open(sentiment_classifier.seed_path, encoding="utf-8") as f:
+        seed = json.load(f)
+    corpus = [text for label in SENTIMENTS for text in seed[label]]
+    rng = random.Random(0)
+    texts = [f"{rng.choice(corpus)} {rng.choice(corpus)}" for _ in range(messages)]
+
+    results = {}
+    for batch_size in batch_sizes:
+        started = time.perf_counter()
+        for i in range(0, len(texts), batch_size):
+            sentiment_classifier.classify_many(texts[i:i + batch_size])
+        elapsed = time.perf_counter() - started
+        results[str(batch_size)] = round(len(texts) / elapsed)
+    return {"messages": messages, "msgs_per_second_by_batch_size": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 500])
+    args = parser.parse_args()
+    print(json.dumps(run(args.messages, args.batch_sizes), indent=2))
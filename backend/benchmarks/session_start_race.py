@@ -0,0 +1,89 @@
+"""
+Measure parallel POST /api/chat/session/start calls contending for the same users.
+
+Every user gets one session of quota and no active session, then each
+user taps "start" `--parallel` times at once; the last user has no quota
+and gets 403s. Reports status counts, throughput and latency. That the
+quota is charged once is asserted by tests/test_session_start.py. Uses the
+same in-process setup as benchmarks.api_hot_paths.
+
+Usage: python -m benchmarks.session_start_race [--users 10 --parallel 20]
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.api_hot_paths import PASSWORD, app, percentile
+from app.core.database import SessionLocal
+from app.core.security import create_access_token, get_password_hash
+from app.models.user import User
+
+
+def seed(users: int) -> list:
+    hashed_password = get_password_hash(PASSWORD)
+    db = SessionLocal()
+    try:
+        created = [
+            User(
+                email=f"race{u}@lumen.local",
+                name=f"Race {u}",
+                hashed_password=hashed_password,
+                # The last user has no quota left
+                available_sessions=0 if u == users else 1,
+                used_sessions=0,
+            )
+            for u in range(users + 1)
+        ]
+        db.add_all(created)
+        db.commit()
+        return [{"id": user.id, "email": user.email, "token": create_access_token({"sub": user.email})} for user in created]
+    finally:
+        db.close()
+
+
+async def run(users: int, parallel: int) -> dict:
+    fixtures = seed(users)
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            latencies = []
+            statuses = Counter()
+
+            async def start(fixture: dict) -> None:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/chat/session/start", headers={"Authorization": f"Bearer {fixture['token']}"}
+                )
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[response.status_code] += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(start(fixture) for fixture in fixtures for _ in range(parallel)))
+            elapsed = time.perf_counter() - started
+    finally:
+        await app.router.shutdown()
+
+    latencies.sort()
+    return {
+        "users": len(fixtures),
+        "parallel": parallel,
+        "requests": len(latencies),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "elapsed_s": round(elapsed, 2),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--parallel", type=int, default=20, help="Concurrent starts per user")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.users, args.parallel)), indent=2))
@@ -16,6 +16,8 @@ load_dotenv()
 from app.core.database import Base
 from app.models.user import User
 from app.models.chat import ChatSession, ChatMessage
+from app.models.job import Job
+from app.models.payment import PaymentInbox
 
 # this is the Alembic Config object
 config = context.config
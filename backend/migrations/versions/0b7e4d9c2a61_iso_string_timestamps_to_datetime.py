@@ -0,0 +1,108 @@
+"""ISO string timestamps to datetime
+
+Revision ID: 0b7e4d9c2a61
+Revises: f2c6d8a14b37
+Create Date: 2025-06-09 14:41:12.306915
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7e4d9c2a61'
+down_revision: Union[str, None] = 'f2c6d8a14b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> columns holding ISO 8601 text
+TIMESTAMP_COLUMNS = {
+    'chat_sessions': ('started_at', 'ended_at'),
+    'chat_messages': ('timestamp',),
+    'users': ('last_login',),
+}
+
+
+def _parse(value):
+    """Parse stored ISO text into a naive UTC datetime; unparseable values become NULL."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _upgrade_postgresql() -> None:
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        for name in columns:
+            # Values that do not look like a timestamp would abort the cast
+            op.execute(f"UPDATE {table} SET {name} = NULL WHERE {name} !~ '^\\d{{4}}-\\d{{2}}-\\d{{2}}'")
+            op.alter_column(
+                table, name,
+                existing_type=sa.String(),
+                type_=sa.DateTime(timezone=True),
+                postgresql_using=f'{name}::timestamptz',
+            )
+
+    # Sessions created through /session/new never got a start time, and message
+    # timestamps were never written; both fall back to created_at, a naive UTC timestamp
+    op.execute("UPDATE chat_sessions SET started_at = created_at AT TIME ZONE 'UTC' WHERE started_at IS NULL")
+    op.execute("UPDATE chat_messages SET timestamp = created_at AT TIME ZONE 'UTC' WHERE timestamp IS NULL")
+
+
+def _upgrade_generic() -> None:
+    bind = op.get_bind()
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        rows = bind.execute(sa.text(f"SELECT id, {', '.join(columns)} FROM {table}")).mappings().all()
+        with op.batch_alter_table(table) as batch_op:
+            for name in columns:
+                batch_op.alter_column(name, existing_type=sa.String(), type_=sa.DateTime(timezone=True))
+        # Stored as UTC; SQLite keeps DateTime values as naive text
+        target = sa.table(table, sa.column('id', sa.Integer), *(sa.column(name, sa.DateTime()) for name in columns))
+        updates = [{'row_id': row['id'], **{name: _parse(row[name]) for name in columns}} for row in rows]
+        if updates:
+            bind.execute(
+                target.update()
+                .where(target.c.id == sa.bindparam('row_id'))
+                .values({name: sa.bindparam(name) for name in columns}),
+                updates
+            )
+
+    # Same created_at fallback as on Postgres
+    op.execute("UPDATE chat_sessions SET started_at = created_at WHERE started_at IS NULL")
+    op.execute("UPDATE chat_messages SET timestamp = created_at WHERE timestamp IS NULL")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        _upgrade_postgresql()
+    else:
+        _upgrade_generic()
+
+    op.create_index('ix_chat_sessions_user_id_started_at', 'chat_sessions', ['user_id', 'started_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_sessions_user_id_started_at', table_name='chat_sessions')
+
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, columns in TIMESTAMP_COLUMNS.items():
+            for name in columns:
+                op.alter_column(
+                    table, name,
+                    existing_type=sa.DateTime(timezone=True),
+                    type_=sa.String(),
+                    postgresql_using=f'to_char({name} AT TIME ZONE \'UTC\', \'YYYY-MM-DD"T"HH24:MI:SS.US"+00:00"\')',
+                )
+    else:
+        for table, columns in TIMESTAMP_COLUMNS.items():
+            with op.batch_alter_table(table) as batch_op:
+                for name in columns:
+                    batch_op.alter_column(name, existing_type=sa.DateTime(timezone=True), type_=sa.String())
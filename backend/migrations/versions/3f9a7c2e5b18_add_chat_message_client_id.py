@@ -0,0 +1,33 @@
+"""Add client_message_id to chat messages
+
+Revision ID: 3f9a7c2e5b18
+Revises: 8e2b6c4f1a03
+Create Date: 2025-06-16 14:08:52.637210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a7c2e5b18'
+down_revision: Union[str, None] = '8e2b6c4f1a03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('chat_messages', sa.Column('client_message_id', sa.String(), nullable=True))
+    op.create_index(
+        'uq_chat_messages_session_id_client_message_id',
+        'chat_messages',
+        ['session_id', 'client_message_id'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_chat_messages_session_id_client_message_id', table_name='chat_messages')
+    op.drop_column('chat_messages', 'client_message_id')
@@ -0,0 +1,28 @@
+"""Add user timezone and locale
+
+Revision ID: 5d8a1f3c7e90
+Revises: 0b7e4d9c2a61
+Create Date: 2025-06-10 10:12:47.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8a1f3c7e90'
+down_revision: Union[str, None] = '0b7e4d9c2a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('timezone', sa.String(), server_default='America/Sao_Paulo', nullable=True))
+    op.add_column('users', sa.Column('locale', sa.String(), server_default='pt-BR', nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'locale')
+    op.drop_column('users', 'timezone')
@@ -0,0 +1,43 @@
+"""Add payment inbox
+
+Revision ID: 8e2b6c4f1a03
+Revises: 5d8a1f3c7e90
+Create Date: 2025-06-12 09:27:35.114862
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2b6c4f1a03'
+down_revision: Union[str, None] = '5d8a1f3c7e90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'payment_inbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('payment_id', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('notification_count', sa.Integer(), nullable=False),
+        sa.Column('last_notification', sa.JSON(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('session_quantity', sa.Integer(), nullable=True),
+        sa.Column('credited_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('payment_id')
+    )
+    op.create_index(op.f('ix_payment_inbox_id'), 'payment_inbox', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_payment_inbox_id'), table_name='payment_inbox')
+    op.drop_table('payment_inbox')
@@ -0,0 +1,50 @@
+"""Add chat query indexes
+
+Revision ID: a7c3e9d41b52
+Revises: 38b2ec9c9990
+Create Date: 2025-06-02 09:14:51.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9d41b52'
+down_revision: Union[str, None] = '38b2ec9c9990'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep only the most recent active session per user so the unique
+    # partial index below can be created
+    op.execute(
+        """
+        UPDATE chat_sessions SET is_active = false
+        WHERE is_active = true AND id NOT IN (
+            SELECT MAX(id) FROM chat_sessions WHERE is_active = true GROUP BY user_id
+        )
+        """
+    )
+
+    op.create_index('ix_chat_sessions_user_id_is_active', 'chat_sessions', ['user_id', 'is_active'], unique=False)
+    op.create_index(
+        'uq_chat_sessions_user_id_active',
+        'chat_sessions',
+        ['user_id'],
+        unique=True,
+        postgresql_where=sa.text('is_active = true'),
+        sqlite_where=sa.text('is_active = 1'),
+    )
+    op.create_index('ix_chat_messages_session_id_created_at', 'chat_messages', ['session_id', 'created_at'], unique=False)
+    op.create_index(op.f('ix_session_summaries_session_id'), 'session_summaries', ['session_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_session_summaries_session_id'), table_name='session_summaries')
+    op.drop_index('ix_chat_messages_session_id_created_at', table_name='chat_messages')
+    op.drop_index('uq_chat_sessions_user_id_active', table_name='chat_sessions')
+    op.drop_index('ix_chat_sessions_user_id_is_active', table_name='chat_sessions')
@@ -0,0 +1,52 @@
+"""Add chat session aggregates
+
+Revision ID: e5b18c2f7a90
+Revises: c41f0d8e6a27
+Create Date: 2025-06-05 16:22:08.731442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b18c2f7a90'
+down_revision: Union[str, None] = 'c41f0d8e6a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('chat_sessions', sa.Column('message_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('chat_sessions', sa.Column('positive_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('chat_sessions', sa.Column('negative_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('chat_sessions', sa.Column('neutral_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('chat_sessions', sa.Column('token_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('chat_sessions', sa.Column('first_message_at', sa.DateTime(), nullable=True))
+    op.add_column('chat_sessions', sa.Column('last_message_at', sa.DateTime(), nullable=True))
+
+    # Backfill from existing messages; token estimate matches estimate_tokens()
+    op.execute(
+        """
+        UPDATE chat_sessions SET
+            message_count = (SELECT COUNT(*) FROM chat_messages m WHERE m.session_id = chat_sessions.id),
+            positive_count = (SELECT COUNT(*) FROM chat_messages m WHERE m.session_id = chat_sessions.id AND m.sentiment = 'positive'),
+            negative_count = (SELECT COUNT(*) FROM chat_messages m WHERE m.session_id = chat_sessions.id AND m.sentiment = 'negative'),
+            neutral_count = (SELECT COUNT(*) FROM chat_messages m WHERE m.session_id = chat_sessions.id AND m.sentiment = 'neutral'),
+            token_count = COALESCE((SELECT SUM((COALESCE(LENGTH(m.content), 0) + 3) / 4 + 4) FROM chat_messages m WHERE m.session_id = chat_sessions.id), 0),
+            first_message_at = (SELECT MIN(m.created_at) FROM chat_messages m WHERE m.session_id = chat_sessions.id),
+            last_message_at = (SELECT MAX(m.created_at) FROM chat_messages m WHERE m.session_id = chat_sessions.id)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('chat_sessions', 'last_message_at')
+    op.drop_column('chat_sessions', 'first_message_at')
+    op.drop_column('chat_sessions', 'token_count')
+    op.drop_column('chat_sessions', 'neutral_count')
+    op.drop_column('chat_sessions', 'negative_count')
+    op.drop_column('chat_sessions', 'positive_count')
+    op.drop_column('chat_sessions', 'message_count')
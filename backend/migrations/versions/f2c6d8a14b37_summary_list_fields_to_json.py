@@ -0,0 +1,90 @@
+"""Summary list fields to JSON
+
+Revision ID: f2c6d8a14b37
+Revises: e5b18c2f7a90
+Create Date: 2025-06-07 11:03:47.518260
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c6d8a14b37'
+down_revision: Union[str, None] = 'e5b18c2f7a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIST_COLUMNS = ('key_topics', 'suggestions', 'progress_observations')
+
+
+def _as_list(value):
+    if not value:
+        return []
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        # Not JSON: keep the text as a single item rather than dropping it
+        return [value]
+    if isinstance(parsed, list):
+        return [str(item) for item in parsed]
+    return [str(parsed)]
+
+
+def _normalize_rows() -> None:
+    """Rewrite every stored value as a canonical JSON array so the type cast cannot fail."""
+    bind = op.get_bind()
+    summaries = sa.table('session_summaries', sa.column('id', sa.Integer), *(sa.column(name, sa.String) for name in LIST_COLUMNS))
+    rows = bind.execute(sa.select(summaries)).mappings().all()
+    updates = [
+        {'row_id': row['id'], **{name: json.dumps(_as_list(row[name]), ensure_ascii=False) for name in LIST_COLUMNS}}
+        for row in rows
+    ]
+    if updates:
+        bind.execute(
+            summaries.update()
+            .where(summaries.c.id == sa.bindparam('row_id'))
+            .values({name: sa.bindparam(name) for name in LIST_COLUMNS}),
+            updates
+        )
+
+
+def upgrade() -> None:
+    if op.get_context().as_sql:
+        # Rows cannot be read when generating SQL; only empty values are fixed here
+        for name in LIST_COLUMNS:
+            op.execute(f"UPDATE session_summaries SET {name} = '[]' WHERE {name} IS NULL OR {name} = ''")
+    else:
+        _normalize_rows()
+
+    if op.get_bind().dialect.name == 'postgresql':
+        for name in LIST_COLUMNS:
+            op.alter_column(
+                'session_summaries', name,
+                existing_type=sa.String(),
+                type_=postgresql.JSONB(),
+                postgresql_using=f'{name}::jsonb',
+            )
+    else:
+        with op.batch_alter_table('session_summaries') as batch_op:
+            for name in LIST_COLUMNS:
+                batch_op.alter_column(name, existing_type=sa.String(), type_=sa.JSON())
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        for name in LIST_COLUMNS:
+            op.alter_column(
+                'session_summaries', name,
+                existing_type=postgresql.JSONB(),
+                type_=sa.String(),
+                postgresql_using=f'{name}::text',
+            )
+    else:
+        with op.batch_alter_table('session_summaries') as batch_op:
+            for name in LIST_COLUMNS:
+                batch_op.alter_column(name, existing_type=sa.JSON(), type_=sa.String())
@@ -0,0 +1,43 @@
+import argparse
+import time
+
+from app.core.database import SessionLocal
+from app.models.chat import ChatSession
+from app.services.metrics import session_aggregates_repair
+
+
+def repair_session_aggregates(batch_size: int, session_ids=None):
+    """Recompute chat session aggregates from their messages, in batches of sessions."""
+    db = SessionLocal()
+    repaired = 0
+    started = time.perf_counter()
+    try:
+        if session_ids:
+            db.execute(session_aggregates_repair(session_ids))
+            db.commit()
+            repaired = len(session_ids)
+        else:
+            last_id = 0
+            while True:
+                ids = [session_id for (session_id,) in db.query(ChatSession.id).filter(
+                    ChatSession.id > last_id
+                ).order_by(ChatSession.id).limit(batch_size).all()]
+                if not ids:
+                    break
+                db.execute(session_aggregates_repair(ids))
+                db.commit()
+                repaired += len(ids)
+                last_id = ids[-1]
+                print(f"{repaired} sessions repaired")
+    finally:
+        db.close()
+
+    print(f"Done: {repaired} sessions in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute chat_sessions message/sentiment/token aggregates.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("session_ids", type=int, nargs="*", help="Only repair these sessions")
+    args = parser.parse_args()
+    repair_session_aggregates(args.batch_size, args.session_ids)
@@ -0,0 +1,9 @@
+"""Point the app at a throwaway SQLite database and the mock LLM before anything imports its settings."""
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'lumen_test.db')}")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("MERCADOPAGO_ACCESS_TOKEN", "test")
+os.environ.setdefault("LLM_PROVIDER", "mock")
+os.environ.setdefault("JOB_WORKERS_ENABLED", "false")
@@ -0,0 +1,13 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.chat import REPLY_ID_SUFFIX, ChatBatchMessage
+
+
+def test_batch_message_rejects_reply_ids():
+    with pytest.raises(ValidationError):
+        ChatBatchMessage(client_message_id=f"c1{REPLY_ID_SUFFIX}", content="oi")
+
+
+def test_batch_message_accepts_other_ids():
+    assert ChatBatchMessage(client_message_id="c1:replying", content="oi").client_message_id == "c1:replying"
@@ -0,0 +1,159 @@
+"""
+Duplicate and concurrent Mercado Pago notifications credit a payment at most once.
+
+Serves benchmarks.fake_mercadopago on a local port and drives the inbox and
+the payment job handler against it directly: notifications are recorded from
+several threads at once and the job runs several times concurrently, the way
+parallel webhook requests and job workers would.
+"""
+import asyncio
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import uvicorn
+
+from benchmarks import fake_mercadopago
+from app.core.config import settings
+from app.core.database import Base, SessionLocal, engine
+from app.models.job import Job
+from app.models.payment import PaymentInbox
+from app.models.user import User
+from app.services.payments import PAYMENT_JOB, apply_payment, record_payment_notification, run_payment_job
+
+QUANTITY = 3
+CONCURRENCY = 8
+UNKNOWN_USER_ID = 10_000_000
+
+_payment_ids = itertools.count(700_000)
+
+
+@pytest.fixture(scope="module")
+def fake_api_url():
+    Base.metadata.create_all(engine)
+    server = uvicorn.Server(uvicorn.Config(fake_mercadopago.app, host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        thread.join(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join()
+
+
+@pytest.fixture
+def fake_api(fake_api_url, monkeypatch):
+    monkeypatch.setattr(settings, "MERCADOPAGO_API_URL", fake_api_url)
+    return fake_mercadopago
+
+
+@pytest.fixture
+def user_id():
+    db = SessionLocal()
+    try:
+        user = User(email=f"payer-{next(_payment_ids)}@lumen.local", name="payer", hashed_password="x", available_sessions=0)
+        db.add(user)
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def new_payment(fake_api, status: str, user_id: int) -> str:
+    payment_id = str(next(_payment_ids))
+    fake_api.payments[payment_id] = {
+        "id": int(payment_id),
+        "status": status,
+        "metadata": {"user_id": user_id, "session_quantity": QUANTITY},
+    }
+    return payment_id
+
+
+def notify(payment_id: str, times: int) -> None:
+    def record(_):
+        db = SessionLocal()
+        try:
+            record_payment_notification(db, payment_id, {"type": "payment", "data": {"id": payment_id}})
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(CONCURRENCY) as pool:
+        list(pool.map(record, range(times)))
+
+
+def run_jobs(payment_id: str, times: int) -> None:
+    async def run_all():
+        sessions = [SessionLocal() for _ in range(times)]
+        try:
+            await asyncio.gather(*(run_payment_job(db, {"payment_id": payment_id}) for db in sessions))
+        finally:
+            for db in sessions:
+                db.close()
+
+    asyncio.run(run_all())
+
+
+def load(payment_id: str, user_id: int = None) -> tuple:
+    db = SessionLocal()
+    try:
+        inbox = db.query(PaymentInbox).filter(PaymentInbox.payment_id == payment_id).one()
+        jobs = db.query(Job).filter(Job.kind == PAYMENT_JOB, Job.dedupe_key == payment_id).count()
+        sessions = db.get(User, user_id).available_sessions if user_id is not None else None
+        return inbox, jobs, sessions
+    finally:
+        db.close()
+
+
+def test_duplicate_notifications_share_one_inbox_row_and_job(fake_api, user_id):
+    payment_id = new_payment(fake_api, "approved", user_id)
+    notify(payment_id, 2 * CONCURRENCY)
+
+    inbox, jobs, sessions = load(payment_id, user_id)
+    assert inbox.notification_count == 2 * CONCURRENCY
+    assert jobs == 1
+    assert sessions == 0  # Crediting is left to the job
+
+
+def test_concurrent_jobs_credit_an_approved_payment_once(fake_api, user_id):
+    payment_id = new_payment(fake_api, "approved", user_id)
+    notify(payment_id, CONCURRENCY)
+    run_jobs(payment_id, CONCURRENCY)
+    # Duplicates arriving after the credit
+    notify(payment_id, CONCURRENCY)
+    run_jobs(payment_id, CONCURRENCY)
+
+    inbox, _, sessions = load(payment_id, user_id)
+    assert sessions == QUANTITY
+    assert inbox.credited_at is not None
+    assert inbox.status == "approved"
+
+    db = SessionLocal()
+    try:
+        assert apply_payment(db, payment_id, fake_api.payments[payment_id]) is False
+    finally:
+        db.close()
+    assert load(payment_id, user_id)[2] == QUANTITY
+
+
+def test_rejected_payment_is_not_credited(fake_api, user_id):
+    payment_id = new_payment(fake_api, "rejected", user_id)
+    notify(payment_id, CONCURRENCY)
+    run_jobs(payment_id, CONCURRENCY)
+
+    inbox, _, sessions = load(payment_id, user_id)
+    assert sessions == 0
+    assert inbox.credited_at is None
+    assert inbox.status == "rejected"
+
+
+def test_payment_for_unknown_user_is_recorded_without_credit(fake_api):
+    payment_id = new_payment(fake_api, "approved", UNKNOWN_USER_ID)
+    notify(payment_id, CONCURRENCY)
+    run_jobs(payment_id, CONCURRENCY)
+
+    inbox, _, _ = load(payment_id)
+    assert inbox.status == "approved"
+    assert inbox.user_id is None
+    assert inbox.credited_at is None
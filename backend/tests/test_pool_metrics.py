@@ -0,0 +1,69 @@
+"""
+Stress the instrumented pool with more concurrent requests than it has connections.
+
+Twelve threads share a 2 + 1 pool with a short timeout and hold each
+connection for a while, so the first three get a connection and the rest
+time out. The metrics must account for every attempt.
+"""
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.database import InstrumentedQueuePool, _record_hold_times, pool_metrics
+
+THREADS = 12
+HOLD_SECONDS = 1.0
+POOL_TIMEOUT = 0.2
+
+
+@pytest.fixture
+def small_engine():
+    engine = create_engine(
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'pool.db')}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=2,
+        max_overflow=1,
+        pool_timeout=POOL_TIMEOUT,
+    )
+    _record_hold_times(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_pool_metrics_under_contention(small_engine):
+    before = pool_metrics.snapshot(small_engine.pool)
+    checkins_before, hold_total_before = pool_metrics.checkins, pool_metrics.hold_seconds_total
+    outcomes = []
+    barrier = threading.Barrier(THREADS)
+
+    def request() -> None:
+        barrier.wait()
+        try:
+            with small_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                time.sleep(HOLD_SECONDS)
+            outcomes.append("ok")
+        except PoolTimeoutError:
+            outcomes.append("timeout")
+
+    threads = [threading.Thread(target=request) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    after = pool_metrics.snapshot(small_engine.pool)
+    assert outcomes.count("ok") == 3
+    assert after["checkouts"] - before["checkouts"] == 3
+    assert after["timeouts"] - before["timeouts"] == THREADS - 3
+    assert after["wait_seconds_max"] >= POOL_TIMEOUT
+    assert after["checked_out"] == 0
+
+    checkins = pool_metrics.checkins - checkins_before
+    assert checkins == 3
+    assert (pool_metrics.hold_seconds_total - hold_total_before) / checkins >= HOLD_SECONDS
@@ -0,0 +1,66 @@
+"""
+The hot chat queries must be answered from the indexes added for them.
+
+Runs the real query helpers against SQLite, captures the SQL they send and
+checks its EXPLAIN QUERY PLAN: an index search on the expected columns, no
+full table scan and no temporary sort for the ORDER BY.
+"""
+import asyncio
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app.api.endpoints import chat
+from app.core.database import AsyncSessionLocal, Base, async_engine, engine
+from app.models.chat import ChatSession
+
+
+@pytest.fixture(scope="module")
+def query_plans():
+    Base.metadata.create_all(engine)
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    async def run_queries():
+        async with AsyncSessionLocal() as db:
+            await chat._get_active_session(db, 1)
+            await chat._get_context(db, ChatSession(id=1, user_id=1))
+            await chat._get_messages_by_session(db, [1, 2])
+            await chat._get_message_stats(db, [1, 2])
+        await async_engine.dispose()
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        asyncio.run(run_queries())
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+    with engine.connect() as conn:
+        return [
+            " | ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            for statement, parameters in statements
+        ]
+
+
+# One entry per query run by the fixture, in the same order
+EXPECTED_PLANS = (
+    r"SEARCH chat_sessions USING INDEX (ix_chat_sessions_user_id_is_active|uq_chat_sessions_user_id_active) \(user_id=\?",
+    r"SEARCH chat_messages USING INDEX ix_chat_messages_session_id_created_at \(session_id=\?\)",
+    r"SEARCH chat_messages USING INDEX ix_chat_messages_session_id_created_at \(session_id=\?\)",
+    r"SEARCH chat_messages USING COVERING INDEX \w+ \(session_id=\?\)",
+)
+
+
+@pytest.mark.parametrize(
+    "position, pattern",
+    list(enumerate(EXPECTED_PLANS)),
+    ids=["active_session", "context", "history_messages", "history_stats"],
+)
+def test_hot_query_uses_index(query_plans, position, pattern):
+    plan = query_plans[position]
+    assert re.search(pattern, plan), plan
+    assert "SCAN" not in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from app.services.risk_detector import RiskDetector
+
+
+@pytest.fixture(scope="module")
+def detector():
+    return RiskDetector()
+
+
+@pytest.mark.parametrize("text, level", [
+    ("penso em suicídios", "high"),
+    ("Pensei em me SUICIDAR ontem", "high"),
+    ("estamos desesperados", "medium"),
+    ("estou desesperada", "medium"),
+    ("vi um vídeo sobre automutilação", "medium"),
+    ("hoje foi um dia tranquilo no trabalho", "low"),
+])
+def test_inflected_forms_are_flagged(detector, text, level):
+    assert detector.scan(text).level == level
+
+
+def test_overlapping_phrases_score_the_longest_match(detector):
+    assessment = detector.scan("quero me matar")
+    assert assessment.score == 10
+    assert assessment.matches == ("me matar",)
+
+
+def test_stem_inside_a_phrase_is_not_counted_twice(tmp_path):
+    path = tmp_path / "lexicon.json"
+    path.write_text(json.dumps({
+        "levels": {"medium": 4, "high": 10},
+        "terms": [{"phrase": "suicid*", "weight": 10}, {"phrase": "me suicidar", "weight": 10}],
+    }))
+    assessment = RiskDetector(lexicon_path=str(path)).scan("pensei em me suicidar")
+    assert assessment.score == 10
+    assert assessment.matches == ("me suicidar",)
+
+
+def test_distinct_phrases_add_up(detector):
+    assessment = detector.scan("não aguento mais, quero morrer")
+    assert assessment.score == 15
+    assert set(assessment.matches) == {"nao aguento mais", "quero morrer"}
+
+
+def test_repeated_phrase_counts_once(detector):
+    assert detector.scan("matar, matar, matar").score == 2
+
+
+def test_reload_picks_up_new_stems(tmp_path):
+    path = tmp_path / "lexicon.json"
+    path.write_text(json.dumps({"levels": {"medium": 4, "high": 10}, "terms": [{"phrase": "sozinh*", "weight": 4}]}))
+    detector = RiskDetector(lexicon_path=str(path), reload_interval=0)
+    assert detector.scan("me sinto sozinhos").level == "medium"
+
+    path.write_text(json.dumps({"levels": {"medium": 4, "high": 10}, "terms": [{"phrase": "isolad*", "weight": 10}]}))
+    detector.load()
+    assert detector.scan("me sinto sozinhos").level == "low"
+    assert detector.scan("estamos isolados").level == "high"
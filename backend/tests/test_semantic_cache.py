@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import semantic_cache as semantic_cache_module
+from app.services.semantic_cache import SemanticResponseCache
+
+FINGERPRINT = SemanticResponseCache.fingerprint("mock", "system prompt")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(semantic_cache_module, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+@pytest.fixture
+def cache(clock):
+    return SemanticResponseCache(enabled=True, threshold=0.9, ttl=60, maxsize=10)
+
+
+def test_near_duplicate_reuses_the_reply(cache):
+    cache.store("Não consigo dormir direito", FINGERPRINT, "reply")
+    assert cache.lookup("nao consigo dormir direito!", FINGERPRINT) == "reply"
+    assert cache.lookup("Não consigo dormir direito", SemanticResponseCache.fingerprint("other")) is None
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("não consigo dormir", "consigo dormir"),
+    ("consigo dormir", "não consigo dormir"),
+    ("não estou ansioso", "estou ansioso"),
+    ("nunca me sinto bem", "me sinto bem"),
+    ("fiquei sem vontade de sair", "fiquei com vontade de sair"),
+])
+def test_negated_message_does_not_match(cache, stored, asked):
+    cache.store(stored, FINGERPRINT, "reply")
+    assert cache.lookup(asked, FINGERPRINT) is None
+    assert cache.stats()["similar_hits"] == 0
+
+
+def test_risky_messages_skip_the_cache(cache):
+    assert not cache.accepts("às vezes penso em me matar", turns=0)
+    assert cache.accepts("hoje foi um dia tranquilo no trabalho", turns=0)
+    assert cache.stats()["skipped_risk"] == 1
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.store("hoje foi um dia tranquilo", FINGERPRINT, "reply")
+    clock.value += 59
+    assert cache.lookup("hoje foi um dia tranquilo", FINGERPRINT) == "reply"
+    clock.value += 2
+    assert cache.lookup("hoje foi um dia tranquilo", FINGERPRINT) is None
+    assert cache.lookup("hoje foi um dia tranquilo.", FINGERPRINT) is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = SemanticResponseCache(enabled=True, threshold=0.99, ttl=60, maxsize=2)
+    cache.store("primeira mensagem", FINGERPRINT, "first")
+    cache.store("segunda mensagem", FINGERPRINT, "second")
+    assert cache.lookup("primeira mensagem", FINGERPRINT) == "first"
+    cache.store("terceira mensagem", FINGERPRINT, "third")
+
+    assert len(cache) == 2
+    assert cache.lookup("segunda mensagem", FINGERPRINT) is None
+    assert cache.lookup("primeira mensagem", FINGERPRINT) == "first"
+    assert cache.lookup("terceira mensagem", FINGERPRINT) == "third"
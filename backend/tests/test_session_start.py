@@ -0,0 +1,106 @@
+"""
+Parallel POST /api/chat/session/start calls for one user must reserve one session.
+
+Each user taps "start" several times at once through the in-process app.
+Every call must return the same active session and the quota must be
+charged once; a user without quota only gets 403s.
+"""
+import asyncio
+import itertools
+from collections import Counter
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from app.core.database import SessionLocal
+from app.core.security import create_access_token
+from app.main import app
+from app.models.chat import ChatSession
+from app.models.user import User
+
+PARALLEL = 20
+
+_user_numbers = itertools.count()
+
+
+def create_user(available_sessions: int) -> dict:
+    db = SessionLocal()
+    try:
+        user = User(
+            email=f"start-race-{next(_user_numbers)}@lumen.local",
+            name="Start race",
+            hashed_password="x",
+            available_sessions=available_sessions,
+            used_sessions=0,
+        )
+        db.add(user)
+        db.commit()
+        return {"id": user.id, "token": create_access_token({"sub": user.email})}
+    finally:
+        db.close()
+
+
+def start_in_parallel(users: list, parallel: int) -> dict:
+    """Return (status, session id) of every call, per user id."""
+    async def run():
+        await app.router.startup()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                async def start(user: dict) -> tuple:
+                    response = await client.post(
+                        "/api/chat/session/start", headers={"Authorization": f"Bearer {user['token']}"}
+                    )
+                    return user["id"], response.status_code, response.json().get("id")
+
+                results = await asyncio.gather(*(start(user) for user in users for _ in range(parallel)))
+        finally:
+            await app.router.shutdown()
+        return results
+
+    responses = {user["id"]: [] for user in users}
+    for user_id, status, session_id in asyncio.run(run()):
+        responses[user_id].append((status, session_id))
+    return responses
+
+
+def load(user_id: int) -> tuple:
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        active = db.scalar(
+            select(func.count(ChatSession.id)).where(ChatSession.user_id == user_id, ChatSession.is_active == True)
+        )
+        return active, user.available_sessions, user.used_sessions
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="module")
+def race():
+    users = {"with_quota": [create_user(1) for _ in range(3)], "without_quota": [create_user(0)]}
+    responses = start_in_parallel(users["with_quota"] + users["without_quota"], PARALLEL)
+    return users, responses
+
+
+def test_parallel_starts_return_one_session(race):
+    users, responses = race
+    for user in users["with_quota"]:
+        statuses = Counter(status for status, _ in responses[user["id"]])
+        session_ids = {session_id for _, session_id in responses[user["id"]]}
+        assert statuses == {200: PARALLEL}
+        assert len(session_ids) == 1
+
+
+def test_parallel_starts_charge_the_quota_once(race):
+    users, _ = race
+    for user in users["with_quota"]:
+        assert load(user["id"]) == (1, 1, 1)
+
+
+def test_parallel_starts_without_quota_are_refused(race):
+    users, responses = race
+    for user in users["without_quota"]:
+        assert {status for status, _ in responses[user["id"]]} == {403}
+        assert load(user["id"]) == (0, 0, 0)
@@ -9,6 +9,7 @@ export const API_ENDPOINTS = {
       MESSAGES: (sessionId: number) => `${API_BASE_URL}/chat/session/${sessionId}/messages`,
       GET_SUMMARY: (sessionId: number) => `${API_BASE_URL}/summary/sessions/${sessionId}/summary`,
       CREATE_SUMMARY: (sessionId: number) => `${API_BASE_URL}/summary/sessions/${sessionId}/summary`,
+      SUMMARY_STATUS: (sessionId: number) => `${API_BASE_URL}/summary/sessions/${sessionId}/summary/status`,
     },
     MESSAGE: `${API_BASE_URL}/chat/message`,
     HISTORY: `${API_BASE_URL}/chat/history`,
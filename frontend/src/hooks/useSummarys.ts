@@ -1,18 +1,30 @@
 import { API_ENDPOINTS } from "../config/api";
-import { SessionSummary } from "../types/session";
+import { SessionSummary, SummaryJobStatus } from "../types/session";
 import axios from 'axios';
 
+const SUMMARY_POLL_INTERVAL_MS = 1500;
+const SUMMARY_POLL_ATTEMPTS = 40;
+
 export const useSummarys = (sessionId: number | null) => {
 
 const createSessionSummary = async () => {
     if (!sessionId) return null;
     
     try {
-      const response = await axios.post<SessionSummary>(
+      // Summaries are generated in the background: enqueue, then poll the status
+      let { data: job } = await axios.post<SummaryJobStatus>(
         API_ENDPOINTS.CHAT.SESSION.CREATE_SUMMARY(sessionId),
         { headers: { Authorization: `Bearer ${localStorage.getItem('token')}` } }
       );
-      return response.data;
+      for (let attempt = 0; job.status !== 'succeeded' && job.status !== 'failed' && attempt < SUMMARY_POLL_ATTEMPTS; attempt++) {
+        await new Promise(resolve => setTimeout(resolve, SUMMARY_POLL_INTERVAL_MS));
+        ({ data: job } = await axios.get<SummaryJobStatus>(
+          API_ENDPOINTS.CHAT.SESSION.SUMMARY_STATUS(sessionId),
+          { headers: { Authorization: `Bearer ${localStorage.getItem('token')}` } }
+        ));
+      }
+      if (job.status !== 'succeeded') return null;
+      return await getSessionSummary();
     } catch (error) {
       console.error('Error creating session summary:', error);
       return null;
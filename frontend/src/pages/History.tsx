@@ -25,24 +25,42 @@ const History: React.FC = () => {
   const [sessions, setSessions] = useState<ChatSession[]>([]);
   const [loading, setLoading] = useState(true);
   const [selectedSession, setSelectedSession] = useState<ChatSession | null>(null);
+  const [displayPrefs, setDisplayPrefs] = useState({ timezone: 'America/Sao_Paulo', locale: 'pt-BR' });
+  const [nextCursor, setNextCursor] = useState<number | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
-  useEffect(() => {
-    const fetchSessions = async () => {
-      try {
-        const response = await axios.get<{sessions: ChatSession[]}>(API_ENDPOINTS.CHAT.HISTORY);
-        setSessions(response.data.sessions);
-      } catch (error) {
-        console.error('Error fetching chat history:', error);
-      } finally {
-        setLoading(false);
-      }
-    };
+  // The history endpoint is paginated; each page returns the cursor of the next, older one
+  const fetchSessions = async (cursor: number | null = null) => {
+    try {
+      const response = await axios.get<{
+        sessions: ChatSession[];
+        next_cursor: number | null;
+        timezone: string;
+        locale: string;
+      }>(API_ENDPOINTS.CHAT.HISTORY, { params: cursor === null ? {} : { cursor } });
+      setSessions((previous) => (cursor === null ? response.data.sessions : [...previous, ...response.data.sessions]));
+      setNextCursor(response.data.next_cursor);
+      // Timestamps arrive in UTC; render them in the user's preferred timezone
+      setDisplayPrefs({ timezone: response.data.timezone, locale: response.data.locale });
+    } catch (error) {
+      console.error('Error fetching chat history:', error);
+    }
+  };
 
-    fetchSessions();
+  useEffect(() => {
+    fetchSessions().finally(() => setLoading(false));
   }, []);
 
+  const loadMoreSessions = async () => {
+    if (nextCursor === null || loadingMore) return;
+    setLoadingMore(true);
+    await fetchSessions(nextCursor);
+    setLoadingMore(false);
+  };
+
   const formatDate = (dateString: string) => {
-    return new Date(dateString).toLocaleDateString('pt-BR', {
+    return new Date(dateString).toLocaleDateString(displayPrefs.locale, {
+      timeZone: displayPrefs.timezone,
       day: '2-digit',
       month: '2-digit',
       year: 'numeric',
@@ -116,6 +134,18 @@ const History: React.FC = () => {
                     </div>
                   </li>
                 ))}
+                {nextCursor !== null && (
+                  <li className="px-4 py-3 text-center">
+                    <button
+                      type="button"
+                      onClick={loadMoreSessions}
+                      disabled={loadingMore}
+                      className="text-sm font-medium text-blue-600 hover:text-blue-800 disabled:opacity-50"
+                    >
+                      {loadingMore ? 'Carregando...' : 'Carregar sessões anteriores'}
+                    </button>
+                  </li>
+                )}
               </ul>
             </div>
           </div>
@@ -16,6 +16,13 @@ export interface SessionSummary {
     duration_minutes: number
 }
 
+export interface SummaryJobStatus {
+    session_id: number;
+    status: 'pending' | 'running' | 'succeeded' | 'failed' | 'not_found';
+    attempts: number;
+    last_error: string | null;
+}
+
 export interface AvailableSessions {
     available_sessions: number;
     used_sessions: number;